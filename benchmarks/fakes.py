@@ -0,0 +1,269 @@
+"""Offline stand-ins for the Gemini model and the Pixabay HTTP session.
+
+Both replay the recorded fixture in benchmarks/fixtures with configurable latency,
+error rate and (for Gemini) malformed-JSON rate, so RecipeGenerator can be
+benchmarked without API keys or spend.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import requests
+from google.api_core import exceptions as google_exceptions
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'grilled_chicken_recipe.json')
+
+# Typical real-world latency (seconds) per request kind, scaled by `latency_scale`
+BASE_LATENCY = {
+    'image_keyword': 0.8,
+    'alt_texts': 1.0,
+    'image_keyword_batch': 2.0,
+    'alt_texts_batch': 4.0,
+    'recipe_content': 12.0,
+    'seo': 14.0,
+    'seo_patch': 5.0,
+    'section_repair': 3.0,
+    'fused': 15.0,
+    'image_search': 0.4
+}
+
+_KEYWORD_RE = re.compile(r'''(?:for|keyword|from) ["']([^"']+)["']''')
+_SECTIONS_RE = re.compile(r'Sections to regenerate: ([a-z_, ]+)')
+_NUMBERED_RE = re.compile(r'^\s*(\d+)\. (.+?)\s*$', re.MULTILINE)
+
+
+def load_fixture(path: str = FIXTURE_PATH) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        prompt_tokens = len(prompt) // 4
+        output_tokens = len(text) // 4
+        self.usage_metadata = type('UsageMetadata', (), {
+            'prompt_token_count': prompt_tokens,
+            'candidates_token_count': output_tokens,
+            'total_token_count': prompt_tokens + output_tokens
+        })()
+
+
+class _AsyncChunks:
+    def __init__(self, chunks, delay: float):
+        self._chunks = iter(chunks)
+        self._delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+        await asyncio.sleep(self._delay)
+        return chunk
+
+
+class FakeGeminiModel:
+    """Drop-in replacement for genai.GenerativeModel used by GeminiService"""
+
+    def __init__(self, fixture: Dict = None, latency_scale: float = 0.01, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, seed: Optional[int] = None, stream_chunks: int = 20,
+                 short_rate: float = 0.0):
+        self.fixture = fixture or load_fixture()
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.short_rate = short_rate
+        self.stream_chunks = stream_chunks
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.errors = Counter()
+        self.malformed = Counter()
+        self.short = Counter()
+
+    # ---- GenerativeModel API ----
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        kind, delay, text = self._prepare(prompt)
+        if stream:
+            return self._stream(prompt, text, delay)
+        time.sleep(delay)
+        return FakeResponse(text, prompt)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        kind, delay, text = self._prepare(prompt)
+        if stream:
+            return _AsyncChunks(self._chunks(prompt, text), delay / self.stream_chunks)
+        await asyncio.sleep(delay)
+        return FakeResponse(text, prompt)
+
+    # ---- Internals ----
+
+    def _prepare(self, prompt: str):
+        kind = self.classify(prompt)
+        with self._lock:
+            self.calls[kind] += 1
+            failed = self._random.random() < self.error_rate
+            malformed = self._random.random() < self.malformed_rate
+            short = self._random.random() < self.short_rate
+            jitter = self._random.uniform(0.7, 1.3)
+        delay = BASE_LATENCY[kind] * self.latency_scale * jitter
+        if failed:
+            with self._lock:
+                self.errors[kind] += 1
+            time.sleep(delay * 0.1)
+            raise google_exceptions.ServiceUnavailable("Injected benchmark failure")
+        text = self._render(kind, prompt, short and kind in ('recipe_content', 'fused'))
+        if short and kind in ('recipe_content', 'fused'):
+            with self._lock:
+                self.short[kind] += 1
+        if malformed and kind not in ('image_keyword', 'alt_texts'):
+            with self._lock:
+                self.malformed[kind] += 1
+            text = self._corrupt(text)
+        return kind, delay, text
+
+    def _stream(self, prompt: str, text: str, delay: float):
+        per_chunk = delay / self.stream_chunks
+        for chunk in self._chunks(prompt, text):
+            time.sleep(per_chunk)
+            yield chunk
+
+    def _chunks(self, prompt: str, text: str):
+        size = max(1, len(text) // self.stream_chunks)
+        return [type('Chunk', (), {'text': text[i:i + size]})() for i in range(0, len(text), size)]
+
+    @staticmethod
+    def classify(prompt: str) -> str:
+        if 'Extract the best search term for each' in prompt:
+            return 'image_keyword_batch'
+        if 'for each recipe keyword below' in prompt:
+            return 'alt_texts_batch'
+        if 'Extract the best single search term' in prompt:
+            return 'image_keyword'
+        if 'alt text descriptions' in prompt:
+            return 'alt_texts'
+        if 'recipe developer and SEO writer' in prompt:
+            return 'fused'
+        if 'Regenerate these sections' in prompt:
+            return 'section_repair'
+        if 'Improve these sections' in prompt:
+            return 'seo_patch'
+        if 'Enhance the recipe content' in prompt:
+            return 'seo'
+        return 'recipe_content'
+
+    def _render(self, kind: str, prompt: str, short: bool = False) -> str:
+        if kind.endswith('_batch'):
+            return self._render_batch(kind, prompt)
+        match = _KEYWORD_RE.search(prompt)
+        keyword = match.group(1) if match else self.fixture['keyword']
+        fixture = json.loads(json.dumps(self.fixture).replace(self.fixture['keyword'], keyword))
+        if short:
+            # Typical under-delivery: a truncated FAQ block and no tips
+            fixture['recipe']['faqs'] = fixture['recipe']['faqs'][:2]
+            fixture['recipe']['tips'] = []
+
+        if kind == 'image_keyword':
+            return fixture['image_keyword']
+        if kind == 'alt_texts':
+            return '\n'.join(fixture['alt_texts'])
+        if kind == 'fused':
+            return json.dumps({
+                'image_keyword': fixture['image_keyword'],
+                'recipe': fixture['recipe'],
+                'alt_texts': fixture['alt_texts']
+            })
+        if kind == 'section_repair':
+            sections = [name.strip() for name in _SECTIONS_RE.search(prompt).group(1).split(',')]
+            return json.dumps({name: fixture['recipe'][name] for name in sections if name in fixture['recipe']})
+        if kind == 'seo_patch':
+            return json.dumps({'faqs': fixture['recipe']['faqs'], 'tips': fixture['recipe']['tips']})
+        return '```json\n' + json.dumps(fixture['recipe'], indent=2) + '\n```'
+
+    def _render_batch(self, kind: str, prompt: str) -> str:
+        keyword = self.fixture['keyword']
+        items = []
+        for number, item_keyword in _NUMBERED_RE.findall(prompt.split('keywords:', 1)[-1]):
+            if kind == 'image_keyword_batch':
+                items.append({'id': int(number), 'image_keyword': self.fixture['image_keyword']})
+            else:
+                alt_texts = [text.replace(keyword, item_keyword) for text in self.fixture['alt_texts']]
+                items.append({'id': int(number), 'alt_texts': alt_texts})
+        return json.dumps({'items': items})
+
+    def _corrupt(self, text: str) -> str:
+        """Malformations seen in real output; some are repairable, some are not"""
+        with self._lock:
+            choice = self._random.choice(['truncate', 'trailing_comma', 'prose', 'garbage'])
+            cut = self._random.uniform(0.5, 0.95)
+        if choice == 'truncate':
+            return text[:int(len(text) * cut)]
+        if choice == 'trailing_comma':
+            return re.sub(r'\]', ',]', text, count=2)
+        if choice == 'prose':
+            return "Here is your recipe!\n" + text + "\nLet me know if you need anything else."
+        return "I'm sorry, I can't help with that right now."
+
+
+class FakePixabaySession:
+    """Drop-in replacement for the requests.Session used by PixabayService"""
+
+    def __init__(self, fixture: Dict = None, latency_scale: float = 0.01, error_rate: float = 0.0,
+                 seed: Optional[int] = None, rate_limit: int = 100, total_hits: int = 60):
+        self.fixture = fixture or load_fixture()
+        # Distinct hits cycling through the recorded ones, so paging and allocation behave realistically
+        recorded = self.fixture['pixabay_hits']
+        self.hits = [
+            {**recorded[i % len(recorded)], 'id': i + 1,
+             'webformatURL': f"{recorded[i % len(recorded)]['webformatURL']}?hit={i + 1}"}
+            for i in range(total_hits)
+        ]
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def get(self, url: str, params: Dict = None, timeout: float = None):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            jitter = self._random.uniform(0.7, 1.3)
+            remaining = max(0, self.rate_limit - self.calls % self.rate_limit)
+        time.sleep(BASE_LATENCY['image_search'] * self.latency_scale * jitter)
+
+        response = requests.Response()
+        response.url = url
+        response.headers['X-RateLimit-Limit'] = str(self.rate_limit)
+        response.headers['X-RateLimit-Remaining'] = str(remaining)
+        response.headers['X-RateLimit-Reset'] = str(60 * self.latency_scale)
+        if failed:
+            with self._lock:
+                self.errors += 1
+            response.status_code = 500
+            response._content = b'{"error": "Injected benchmark failure"}'
+        else:
+            params = params or {}
+            per_page = int(params.get('per_page', 20))
+            start = (int(params.get('page', 1)) - 1) * per_page
+            response.status_code = 200
+            response._content = json.dumps({
+                'total': len(self.hits),
+                'totalHits': len(self.hits),
+                'hits': self.hits[start:start + per_page]
+            }).encode('utf-8')
+        return response
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark.
+
+Times fresh interpreter runs of the entry points that short-lived processes
+hit, and checks which heavy third-party modules each one imports:
+
+    import        import main
+    generator     construct a RecipeGenerator (no API calls)
+    rerender      import the rerender worker module
+    dry-run       python main.py --dry-run
+
+Usage:
+    python -m benchmarks.import_time [--runs 5] [--budget-ms 300] [--json results.json]
+
+With --budget-ms the exit status is 1 if any scenario's median exceeds the budget.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import': ['-c', 'import main'],
+    'generator': ['-c', 'from core.recipe_generator import RecipeGenerator; RecipeGenerator()'],
+    'rerender': ['-c', 'import core.rerenderer'],
+    'dry-run': ['main.py', '--dry-run']
+}
+
+# Modules that should only load once an API client or the template is first used
+HEAVY_MODULES = ('google.generativeai', 'requests', 'jinja2', 'PIL')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def time_scenario(args: List[str], runs: int) -> Dict:
+    durations = []
+    returncode = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True)
+        durations.append(time.perf_counter() - start)
+        returncode = returncode or result.returncode
+    return {
+        'median_ms': statistics.median(durations) * 1000,
+        'min_ms': min(durations) * 1000,
+        'returncode': returncode
+    }
+
+
+def imported_modules(args: List[str]) -> Dict[str, Dict]:
+    """Module -> {'ms': cumulative import time, 'depth': nesting level}, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(3)] = {'ms': int(match.group(1)) / 1000, 'depth': len(match.group(2))}
+    return modules
+
+
+def import_profile(args: List[str], startup: set) -> Dict:
+    """Heavy modules imported and the slowest top-level imports beyond interpreter startup"""
+    modules = imported_modules(args)
+    top_level = [
+        (name, info['ms']) for name, info in modules.items()
+        if info['depth'] == 1 and name not in startup
+    ]
+    return {
+        'heavy_modules': [m for m in HEAVY_MODULES if m in modules],
+        'slowest': sorted(top_level, key=lambda item: item[1], reverse=True)[:5]
+    }
+
+
+def print_report(name: str, report: Dict):
+    print(f"\n⏱️ {name}: {report['median_ms']:.0f} ms median ({report['min_ms']:.0f} ms min)"
+          + (f", exit {report['returncode']}" if report['returncode'] else ""))
+    print(f"   ├── Heavy modules: {', '.join(report['heavy_modules']) or 'none'}")
+    print(f"   └── Slowest imports (ms)")
+    for module, ms in report['slowest']:
+        print(f"       {module:<40} {ms:8.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Entry point startup benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreter runs per scenario")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="Fail if a scenario's median startup time exceeds this")
+    parser.add_argument('--json', dest='json_path', help="Also write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    baseline = time_scenario(['-c', 'pass'], args.runs)
+    startup = set(imported_modules(['-c', 'pass']))
+    print(f"🐍 Interpreter startup: {baseline['median_ms']:.0f} ms median")
+
+    reports = {}
+    over_budget = []
+    for name in names:
+        report = time_scenario(SCENARIOS[name], args.runs)
+        report.update(import_profile(SCENARIOS[name], startup))
+        print_report(name, report)
+        reports[name] = report
+        if args.budget_ms is not None and report['median_ms'] > args.budget_ms:
+            over_budget.append(name)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'interpreter_ms': baseline['median_ms'], 'scenarios': reports}, f, indent=2)
+
+    if over_budget:
+        print(f"\n❌ Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
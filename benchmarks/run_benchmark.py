@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Offline RecipeGenerator benchmark.
+
+Runs the real pipeline against FakeGeminiModel / FakePixabaySession and reports
+recipes/minute, p50/p95/p99 latency per phase and retry counts for each mode:
+
+    sequential  one keyword at a time, phases strictly in order
+    concurrent  one keyword at a time, image and content branches overlapped
+    batch       BatchRunner with --workers keywords in flight
+
+Usage:
+    python -m benchmarks.run_benchmark --recipes 20 --workers 8 --latency-scale 0.02 \\
+        --error-rate 0.05 --malformed-rate 0.1 [--fused] [--batch-prompts] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from config.settings import Config
+from benchmarks.fakes import FakeGeminiModel, FakePixabaySession, load_fixture
+
+MODES = ('sequential', 'concurrent', 'batch')
+
+# Generator attribute path -> phase name
+TIMED_PHASES = {
+    ('gemini', 'extract_image_keyword'): 'image_keyword',
+    ('pixabay', 'search_food_images'): 'image_search',
+    ('gemini', 'generate_recipe_content'): 'recipe_content',
+    ('validator', 'validate_and_fix'): 'validation',
+    ('gemini', 'regenerate_sections'): 'section_repair',
+    ('gemini', 'enhance_content_for_seo'): 'seo',
+    ('gemini', 'generate_alt_texts'): 'alt_texts',
+    ('gemini', 'generate_fused'): 'fused',
+    ('gemini', 'extract_image_keywords_batch'): 'image_keyword_batch',
+    ('gemini', 'generate_alt_texts_batch'): 'alt_texts_batch',
+    (None, '_render_to_file'): 'render'
+}
+
+
+class PhaseTimer:
+    """Thread-safe collection of per-phase durations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, phase: str, duration: float):
+        with self._lock:
+            self.samples[phase].append(duration)
+
+    def wrap(self, phase: str, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(phase, time.perf_counter() - start)
+        return timed
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def configure_sandbox(args, workdir: str):
+    """Point every output and cache at a throwaway directory and scale retry delays"""
+    from services.gemini_service import GeminiService
+    from utils.retry import CircuitBreaker
+
+    Config.OUTPUT_DIR = f"{workdir}/recipes"
+    Config.LOG_DIR = f"{workdir}/logs"
+    Config.GEMINI_CACHE_MODE = 'off'
+    Config.PIXABAY_INDEX_PATH = f"{workdir}/pixabay_index.sqlite3"
+    Config.GEMINI_FUSED_MODE = args.fused
+    Config.GEMINI_BATCH_PROMPTS = args.batch_prompts
+    Config.RETRY_BASE_DELAY = args.latency_scale
+    Config.RETRY_MAX_DELAY = 60 * args.latency_scale
+    # Fake latencies are scaled down, so real per-key quotas would only add noise
+    Config.GEMINI_RPM = 0
+    Config.GEMINI_TPM = 0
+    GeminiService.circuit_breaker = CircuitBreaker(
+        'Gemini',
+        failure_threshold=Config.CIRCUIT_BREAKER_THRESHOLD,
+        cooldown=Config.CIRCUIT_BREAKER_COOLDOWN * args.latency_scale
+    )
+
+    for path in (Config.OUTPUT_DIR, Config.LOG_DIR):
+        os.makedirs(path, exist_ok=True)
+
+
+def build_generator(args, fixture: Dict, timer: PhaseTimer):
+    from core.recipe_generator import RecipeGenerator
+
+    generator = RecipeGenerator()
+    model = FakeGeminiModel(
+        fixture, args.latency_scale, args.error_rate, args.malformed_rate, seed=args.seed,
+        short_rate=args.short_rate
+    )
+    # One fake serves every task model and API key
+    generator.gemini.model_factory = lambda model_name, api_key: model
+    generator.pixabay.session = FakePixabaySession(
+        fixture, args.latency_scale, args.pixabay_error_rate, seed=args.seed
+    )
+    for (owner, method), phase in TIMED_PHASES.items():
+        target = getattr(generator, owner) if owner else generator
+        setattr(target, method, timer.wrap(phase, getattr(target, method)))
+    return generator, model
+
+
+def run_mode(mode: str, args, fixture: Dict) -> Dict:
+    from core.batch_runner import BatchRunner
+
+    Config.CONCURRENT_PHASES = mode != 'sequential'
+    workers = args.workers if mode == 'batch' else 1
+    keywords = [f"{fixture['keyword']} {i + 1}" for i in range(args.recipes)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_sandbox(args, workdir)
+        timer = PhaseTimer()
+        generator, model = build_generator(args, fixture, timer)
+        session = generator.pixabay.session
+
+        log = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            results = BatchRunner(generator, workers).run(keywords)
+            generator.generation_log.flush()
+        elapsed = time.perf_counter() - start
+
+    for result in results:
+        timer.record('total', result['duration'])
+
+    json_phases = ('recipe_content', 'seo', 'fused', 'section_repair', 'image_keyword_batch', 'alt_texts_batch')
+    logical_calls = sum(len(timer.samples.get(p, [])) for p in json_phases)
+    model_calls = sum(model.calls[k] for k in json_phases + ('seo_patch',))
+    succeeded = sum(1 for r in results if r['success'])
+
+    return {
+        'mode': mode,
+        'workers': workers,
+        'recipes': len(results),
+        'succeeded': succeeded,
+        'elapsed_seconds': elapsed,
+        'recipes_per_minute': succeeded / elapsed * 60 if elapsed else 0.0,
+        'retries': max(0, model_calls - logical_calls),
+        'gemini_calls': dict(model.calls),
+        'injected_errors': dict(model.errors),
+        'injected_malformed': dict(model.malformed),
+        'injected_short': dict(model.short),
+        'pixabay_calls': session.calls,
+        'repaired_json': log.getvalue().count('Repaired malformed JSON'),
+        'phases': {
+            phase: {
+                'count': len(samples),
+                'p50': percentile(samples, 50),
+                'p95': percentile(samples, 95),
+                'p99': percentile(samples, 99)
+            }
+            for phase, samples in sorted(timer.samples.items())
+        }
+    }
+
+
+def print_report(report: Dict, latency_scale: float):
+    print(f"\n📈 Mode: {report['mode']} (workers={report['workers']})")
+    print(f"   ├── Succeeded: {report['succeeded']}/{report['recipes']} in {report['elapsed_seconds']:.2f}s")
+    print(f"   ├── Throughput: {report['recipes_per_minute']:.1f} recipes/min "
+          f"(≈{report['recipes_per_minute'] * latency_scale:.2f} at real latency)")
+    print(f"   ├── Gemini calls: {sum(report['gemini_calls'].values())}, retries: {report['retries']}, "
+          f"locally repaired: {report['repaired_json']}, Pixabay calls: {report['pixabay_calls']}")
+    print(f"   └── Phase latency (ms)      p50      p95      p99")
+    for phase, stats in report['phases'].items():
+        print(f"       {phase:<18} {stats['p50'] * 1000:8.1f} {stats['p95'] * 1000:8.1f} {stats['p99'] * 1000:8.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline RecipeGenerator benchmark")
+    parser.add_argument('--recipes', type=int, default=20, help="Recipes per mode")
+    parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS, help="Workers for batch mode")
+    parser.add_argument('--modes', default=','.join(MODES), help="Comma-separated modes to run")
+    parser.add_argument('--latency-scale', type=float, default=0.01,
+                        help="Multiplier on realistic API latencies (1.0 = real time)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Injected Gemini 503 rate")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Injected malformed JSON rate")
+    parser.add_argument('--short-rate', type=float, default=0.0,
+                        help="Rate of recipes returned with a short FAQ block and no tips")
+    parser.add_argument('--pixabay-error-rate', type=float, default=0.0, help="Injected Pixabay 500 rate")
+    parser.add_argument('--fused', action='store_true', help="Benchmark the fused single-call mode")
+    parser.add_argument('--batch-prompts', action='store_true',
+                        help="Prefetch image keywords and alt texts with batched prompts")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--json', dest='json_path', help="Also write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    fixture = load_fixture()
+    reports = []
+    for mode in modes:
+        report = run_mode(mode, args, fixture)
+        print_report(report, args.latency_scale)
+        reports.append(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,11 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     PIXABAY_API_KEY = os.getenv('PIXABAY_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro-latest')
+    # Optional key pool (comma-separated); requests rotate to the least-loaded key
+    GEMINI_API_KEYS = os.getenv('GEMINI_API_KEYS', '')
+    # Per-task model overrides, e.g. "image_keyword=gemini-1.5-flash,alt_texts=gemini-1.5-flash"
+    # Tasks: image_keyword, recipe_content, seo, section_repair, alt_texts, fused
+    GEMINI_TASK_MODELS = os.getenv('GEMINI_TASK_MODELS', '')
     
     # Recipe Configuration
     MIN_INGREDIENTS = 6
@@ -21,24 +26,124 @@ class Config:
     
     # SEO Configuration
     KEYWORD_APPEARANCE_TARGET = 6  # 6-7 times
+    # full: send and receive the whole recipe; patch: only changed sections, skipped when the target is met
+    SEO_ENHANCEMENT_MODE = os.getenv('SEO_ENHANCEMENT_MODE', 'full')
+    
+    # Ask Gemini to regenerate only the sections the validator flags (short, empty, wrong type)
+    SECTION_REPAIR = os.getenv('SECTION_REPAIR', 'true').lower() == 'true'
     
     # Image Configuration
     IMAGES_PER_RECIPE = 3
     IMAGE_ORIENTATION = 'horizontal'
     IMAGE_SIZE = 'webformatURL'  # Pixabay size option
+    PIXABAY_PER_PAGE = int(os.getenv('PIXABAY_PER_PAGE', '20'))
+    # Image allocation index: hit lists per image keyword and per-image usage counts
+    PIXABAY_INDEX_PATH = os.getenv('PIXABAY_INDEX_PATH', 'output/cache/pixabay_index.sqlite3')
+    PIXABAY_CACHE_TTL_HOURS = float(os.getenv('PIXABAY_CACHE_TTL_HOURS', '24'))
+    PIXABAY_RATE_LIMIT_RESERVE = int(os.getenv('PIXABAY_RATE_LIMIT_RESERVE', '5'))
+    
+    # Local Image Pipeline (requires Pillow): download, resize and serve images from OUTPUT_DIR
+    LOCAL_IMAGES = os.getenv('LOCAL_IMAGES', 'false').lower() == 'true'
+    IMAGE_WIDTHS = os.getenv('IMAGE_WIDTHS', '480,960,1280')  # srcset widths
+    IMAGE_WEBP_QUALITY = int(os.getenv('IMAGE_WEBP_QUALITY', '80'))
+    IMAGE_JPEG_QUALITY = int(os.getenv('IMAGE_JPEG_QUALITY', '82'))
+    IMAGE_SIZES_ATTR = os.getenv('IMAGE_SIZES_ATTR', '(max-width: 800px) 100vw, 800px')
+    IMAGE_INDEX_PATH = os.getenv('IMAGE_INDEX_PATH', 'output/cache/image_index.sqlite3')
     
     # Output Configuration
     OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'output/recipes')
     LOG_DIR = os.getenv('LOG_DIR', 'output/logs')
+    # generation_log.jsonl is rotated into gzipped segments by size or age (0 disables either)
+    GENERATION_LOG_MAX_MB = float(os.getenv('GENERATION_LOG_MAX_MB', '64'))
+    GENERATION_LOG_MAX_AGE_HOURS = float(os.getenv('GENERATION_LOG_MAX_AGE_HOURS', '168'))
+    # Records are written in batches: every N records or this many seconds after the first unwritten one
+    GENERATION_LOG_FLUSH_LINES = int(os.getenv('GENERATION_LOG_FLUSH_LINES', '20'))
+    GENERATION_LOG_FLUSH_SECONDS = float(os.getenv('GENERATION_LOG_FLUSH_SECONDS', '5'))
+    # Pages go in OUTPUT_DIR/<xx>/... by keyword hash, one two-hex-digit level each (0 = flat)
+    OUTPUT_SHARD_LEVELS = int(os.getenv('OUTPUT_SHARD_LEVELS', '1'))
+    # Precompressed siblings for the web server to serve directly: gz, br (br needs brotli)
+    OUTPUT_PRECOMPRESS = os.getenv('OUTPUT_PRECOMPRESS', '')
+    # Localized images, and the URL prefix pages use to reference them
+    IMAGE_ASSET_DIR = os.getenv('IMAGE_ASSET_DIR', os.path.join(OUTPUT_DIR, 'images'))
+    IMAGE_ASSET_URL_PREFIX = os.getenv('IMAGE_ASSET_URL_PREFIX', 'images/')
+    # Compiled template bytecode shared by all processes (empty disables)
+    TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR', 'output/cache/jinja')
+    
+    # Metrics Configuration (comma-separated exporters: text, json)
+    METRICS_EXPORTERS = os.getenv('METRICS_EXPORTERS', '')
+    METRICS_PATH = os.getenv('METRICS_PATH', os.path.join(LOG_DIR, 'metrics.jsonl'))
     
     # API Limits
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1'))
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '60'))
+    CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5'))  # 0 disables
+    CIRCUIT_BREAKER_COOLDOWN = float(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '60'))
+    
+    # Gemini Rate Limits, per API key (0 disables a limit)
+    GEMINI_RPM = int(os.getenv('GEMINI_RPM', '60'))
+    GEMINI_TPM = int(os.getenv('GEMINI_TPM', '1000000'))
+    GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '16'))
+    GEMINI_OUTPUT_TOKEN_ESTIMATE = int(os.getenv('GEMINI_OUTPUT_TOKEN_ESTIMATE', '1500'))
+    
+    # Single structured call for image keyword, SEO-ready recipe and alt texts
+    GEMINI_FUSED_MODE = os.getenv('GEMINI_FUSED_MODE', 'false').lower() == 'true'
+    
+    # Batch runs fetch image keywords and alt texts for GEMINI_BATCH_SIZE keywords per call
+    GEMINI_BATCH_PROMPTS = os.getenv('GEMINI_BATCH_PROMPTS', 'true').lower() == 'true'
+    GEMINI_BATCH_SIZE = int(os.getenv('GEMINI_BATCH_SIZE', '20'))
+    
+    # Stream recipe content and validate sections as they arrive
+    GEMINI_STREAMING = os.getenv('GEMINI_STREAMING', 'false').lower() == 'true'
+    
+    # Gemini Response Cache
+    GEMINI_CACHE_MODE = os.getenv('GEMINI_CACHE_MODE', 'use')  # use | refresh | off
+    GEMINI_CACHE_PATH = os.getenv('GEMINI_CACHE_PATH', 'output/cache/gemini_cache.sqlite3')
+    GEMINI_CACHE_TTL_HOURS = float(os.getenv('GEMINI_CACHE_TTL_HOURS', '720'))
+    GEMINI_CACHE_MAX_MB = int(os.getenv('GEMINI_CACHE_MAX_MB', '256'))
+    
+    # Batch Configuration
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+    JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', 'output/jobs/jobs.sqlite3')
+    # Skip keywords whose normalized token sets overlap an earlier one by at least the threshold
+    KEYWORD_DEDUP = os.getenv('KEYWORD_DEDUP', 'true').lower() == 'true'
+    KEYWORD_DUPLICATE_THRESHOLD = float(os.getenv('KEYWORD_DUPLICATE_THRESHOLD', '0.8'))
+    # HTTP service mode (python main.py serve)
+    SERVICE_HOST = os.getenv('SERVICE_HOST', '127.0.0.1')
+    SERVICE_PORT = int(os.getenv('SERVICE_PORT', '8080'))
+    SERVICE_WORKERS = int(os.getenv('SERVICE_WORKERS', os.getenv('BATCH_WORKERS', '4')))
+    SERVICE_QUEUE_SIZE = int(os.getenv('SERVICE_QUEUE_SIZE', '32'))  # queued generations before 429
+    SERVICE_MAX_JOBS = int(os.getenv('SERVICE_MAX_JOBS', '10000'))  # finished jobs kept for status/result
+    SERVICE_SHUTDOWN_TIMEOUT = float(os.getenv('SERVICE_SHUTDOWN_TIMEOUT', '30'))  # seconds running jobs get to finish
+    # Run the image branch (phases 1, 2, 6) alongside the content branch (phases 3-5)
+    CONCURRENT_PHASES = os.getenv('CONCURRENT_PHASES', 'true').lower() == 'true'
+    
+    @classmethod
+    def gemini_api_keys(cls) -> list:
+        """Key pool from GEMINI_API_KEYS, falling back to the single GEMINI_API_KEY"""
+        keys = [key.strip() for key in cls.GEMINI_API_KEYS.split(',') if key.strip()]
+        if not keys and cls.GEMINI_API_KEY:
+            keys = [cls.GEMINI_API_KEY]
+        return list(dict.fromkeys(keys))
+    
+    @classmethod
+    def gemini_task_models(cls) -> dict:
+        """Task -> model name overrides from GEMINI_TASK_MODELS"""
+        models = {}
+        for entry in cls.GEMINI_TASK_MODELS.split(','):
+            task, _, model = entry.partition('=')
+            if task.strip() and model.strip():
+                models[task.strip()] = model.strip()
+        return models
     
     @classmethod
     def validate(cls):
         """Validate required configuration"""
-        required_keys = ['GEMINI_API_KEY', 'PIXABAY_API_KEY']
+        required_keys = ['PIXABAY_API_KEY']
         missing = [key for key in required_keys if not getattr(cls, key)]
+        if not cls.gemini_api_keys():
+            missing.insert(0, 'GEMINI_API_KEY')
         if missing:
             raise ValueError(f"Missing required configuration: {', '.join(missing)}")
\ No newline at end of file
@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from config.settings import Config
+
+
+class BatchRunner:
+    """Generate many recipes concurrently with a shared RecipeGenerator.
+
+    With `prefetch`, keywords are handed out in chunks of GEMINI_BATCH_SIZE, and
+    each chunk's image keywords and alt texts are fetched with batched prompts
+    before its generations start (see RecipeGenerator.prefetch).
+    """
+
+    def __init__(self, generator, workers: int = None, prefetch: bool = None):
+        self.generator = generator
+        self.workers = max(1, workers or Config.BATCH_WORKERS)
+        self.prefetch = Config.GEMINI_BATCH_PROMPTS if prefetch is None else prefetch
+
+    @staticmethod
+    def read_keywords(stream: TextIO) -> List[str]:
+        """Read one keyword per line, skipping blanks, comments and duplicates"""
+        keywords = []
+        seen = set()
+        for line in stream:
+            keyword = line.strip()
+            if not keyword or keyword.startswith('#'):
+                continue
+            if keyword.lower() in seen:
+                continue
+            seen.add(keyword.lower())
+            keywords.append(keyword)
+        return keywords
+
+    def run(self, keywords: Iterable[str]) -> List[Dict]:
+        """Generate a recipe for every keyword and return per-keyword results in input order"""
+        keywords = list(keywords)
+        results: List[Dict] = [None] * len(keywords)
+
+        print(f"🚀 Starting batch of {len(keywords)} keywords with {self.workers} workers")
+        chunk_size = max(1, Config.GEMINI_BATCH_SIZE if self.prefetch else len(keywords))
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {}
+            for start in range(0, len(keywords), chunk_size):
+                chunk = keywords[start:start + chunk_size]
+                # Queued ahead of the chunk's generations, so it is always running before they wait on it
+                prefetched = executor.submit(self._prefetch, chunk) if self.prefetch and len(chunk) > 1 else None
+                for index, keyword in enumerate(chunk, start):
+                    futures[executor.submit(self._generate_one, keyword, prefetched)] = index
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                status = "✅" if result['success'] else "❌"
+                print(f"{status} [{result['duration']:.1f}s] {result['keyword']}")
+        except KeyboardInterrupt:
+            # Drop everything not yet started (prefetches included); those keywords stay
+            # 'pending' in the job store for `resume`. Generations already running finish.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+        return results
+
+    def _prefetch(self, keywords: List[str]):
+        try:
+            self.generator.prefetch(keywords)
+        except Exception as e:
+            # Each generation then makes its own single-keyword calls
+            print(f"⚠️ Prefetch failed: {e}")
+
+    def _generate_one(self, keyword: str, prefetched: Optional[Future] = None) -> Dict:
+        """Run a single generation, never letting an exception escape the worker"""
+        start = time.monotonic()
+        filename, error = None, None
+        if prefetched is not None:
+            prefetched.result()
+        try:
+            filename = self.generator.generate_recipe(keyword)
+            if not filename:
+                error = "generation returned no output"
+        except Exception as e:
+            error = str(e)
+        return {
+            'keyword': keyword,
+            'success': filename is not None,
+            'filename': filename,
+            'error': error,
+            'duration': time.monotonic() - start
+        }
+
+    @staticmethod
+    def print_summary(results: List[Dict]):
+        """Print per-keyword success/failure summary"""
+        succeeded = [r for r in results if r['success']]
+        failed = [r for r in results if not r['success']]
+
+        print(f"\n{'='*50}")
+        print(f"📊 Batch Summary: {len(succeeded)}/{len(results)} succeeded, {len(failed)} failed")
+        for result in results:
+            if result['success']:
+                print(f"   ✅ {result['keyword']} → {result['filename']}")
+            else:
+                print(f"   ❌ {result['keyword']} → {result['error']}")
+        print(f"{'='*50}")
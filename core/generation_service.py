@@ -0,0 +1,328 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config.settings import Config
+from utils.file_manager import FileManager
+from utils.job_store import STATUS_DONE, STATUS_FAILED, STATUS_PENDING, STATUS_RUNNING, JobStore
+
+# A submit is one small JSON object
+MAX_BODY_BYTES = 16 * 1024
+# Upper bound for ?wait= long polling on the result endpoint
+MAX_WAIT_SECONDS = 60
+
+
+class GenerationService:
+    """Long-running asyncio HTTP front end for a shared RecipeGenerator.
+
+        POST /recipes              {"keyword": "...", "force": false} -> 202 + job
+        GET  /recipes/<id>         job status
+        GET  /recipes/<id>/result  recipe HTML (?format=json for the stored data,
+                                   ?wait=N to block up to N seconds for it;
+                                   409 + job if the generation failed)
+        GET  /health               queue depth and job counts
+
+    A submission for a keyword that is already queued, running, done or in the
+    output manifest (compared in normalised form) joins that job instead of
+    starting another generation. New work waits in a bounded queue; once it is
+    full, submissions get 429, so a burst of traffic cannot multiply API spend.
+    Each generation runs in its own daemon thread. On shutdown, running
+    generations get SERVICE_SHUTDOWN_TIMEOUT seconds to finish. After that they
+    are abandoned, and they stay 'running' in the job store for `resume`.
+    """
+
+    def __init__(self, generator, workers: int = None, queue_size: int = None, max_jobs: int = None):
+        self.generator = generator
+        self.workers = max(1, workers or Config.SERVICE_WORKERS)
+        self.queue_size = max(1, queue_size or Config.SERVICE_QUEUE_SIZE)
+        self.max_jobs = max_jobs or Config.SERVICE_MAX_JOBS
+        # id -> job, oldest first; finished jobs are evicted beyond max_jobs
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._by_key: Dict[str, str] = {}
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._durations = deque(maxlen=50)
+        self._queue: Optional[asyncio.Queue] = None
+        self._threads = set()
+
+    async def serve(self, host: str, port: int):
+        """Run the HTTP server and the generation workers until cancelled"""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self._handle, host, port)
+        print(f"🌐 Serving on http://{host}:{port}")
+        print(f"   ├── Workers: {self.workers}")
+        print(f"   └── Queue size: {self.queue_size}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self._drain(Config.SERVICE_SHUTDOWN_TIMEOUT)
+
+    async def _drain(self, timeout: float):
+        """Give running generations up to `timeout` seconds to finish"""
+        deadline = time.monotonic() + timeout
+        while self._threads and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self._threads:
+            # Daemon threads do not keep the process alive; the job store still says 'running'
+            print(f"⚠️ Abandoned {len(self._threads)} running generations. "
+                  f"Run 'python main.py resume' to finish them.")
+
+    # ---- Jobs ----
+
+    def submit(self, keyword: str, force: bool = False) -> Tuple[Optional[Dict], bool]:
+        """Queue a generation or join an existing one; returns (job, coalesced).
+
+        The job is None when the queue is full.
+        """
+        key = JobStore.make_key(keyword)
+        job = self._jobs.get(self._by_key.get(key))
+        if job and (job['status'] in (STATUS_PENDING, STATUS_RUNNING) or
+                    (job['status'] == STATUS_DONE and not force)):
+            job['requests'] += 1
+            return job, True
+
+        if not force:
+            # Published before this service started (or by a batch run)
+            manifest = self.generator.file_manager.manifest
+            entry = manifest.lookup(keyword)
+            filename = manifest.full_path(entry) if entry else None
+            if filename and os.path.exists(filename):
+                job = self._new_job(keyword, key)
+                job.update(status=STATUS_DONE, filename=filename, started_at=job['submitted_at'],
+                           finished_at=job['submitted_at'])
+                self._finished[job['id']].set()
+                return job, True
+
+        if self._queue.full():
+            return None, False
+        job = self._new_job(keyword, key)
+        self._queue.put_nowait(job['id'])
+        print(f"📥 Queued '{keyword}' ({self._queue.qsize()}/{self.queue_size})")
+        return job, False
+
+    def _new_job(self, keyword: str, key: str) -> Dict:
+        job = {
+            'id': uuid.uuid4().hex,
+            'keyword': keyword,
+            'status': STATUS_PENDING,
+            'filename': None,
+            'error': None,
+            'requests': 1,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None
+        }
+        self._jobs[job['id']] = job
+        self._by_key[key] = job['id']
+        self._finished[job['id']] = asyncio.Event()
+        self._evict()
+        return job
+
+    def _evict(self):
+        """Forget the oldest finished jobs once more than max_jobs are kept"""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            job = self._jobs[job_id]
+            if job['status'] not in (STATUS_DONE, STATUS_FAILED):
+                continue
+            del self._jobs[job_id]
+            del self._finished[job_id]
+            key = JobStore.make_key(job['keyword'])
+            if self._by_key.get(key) == job_id:
+                del self._by_key[key]
+            excess -= 1
+
+    async def _worker(self):
+        while True:
+            job = self._jobs[await self._queue.get()]
+            job['status'] = STATUS_RUNNING
+            job['started_at'] = time.time()
+            try:
+                filename = await self._generate(job['keyword'])
+                error = None if filename else "generation returned no output"
+            except Exception as e:
+                filename, error = None, str(e)
+            job['finished_at'] = time.time()
+            job.update(status=STATUS_DONE if filename else STATUS_FAILED, filename=filename, error=error)
+            self._durations.append(job['finished_at'] - job['started_at'])
+            self._finished[job['id']].set()
+            self._queue.task_done()
+
+            status = "✅" if filename else "❌"
+            print(f"{status} [{job['finished_at'] - job['started_at']:.1f}s] {job['keyword']} "
+                  f"({job['requests']} requests)")
+
+    def _generate(self, keyword: str) -> asyncio.Future:
+        """Run generate_recipe in a daemon thread; the returned future resolves on the event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(result, error):
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+        def run():
+            result, error = None, None
+            try:
+                result = self.generator.generate_recipe(keyword)
+            except Exception as e:
+                error = e
+            finally:
+                self._threads.discard(thread)
+            try:
+                loop.call_soon_threadsafe(resolve, result, error)
+            except RuntimeError:
+                pass  # the loop is already closed
+
+        thread = threading.Thread(target=run, name=f"generate-{keyword}", daemon=True)
+        self._threads.add(thread)
+        thread.start()
+        return future
+
+    def _retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up"""
+        average = sum(self._durations) / len(self._durations) if self._durations else 30.0
+        return max(1, math.ceil(average / self.workers))
+
+    # ---- HTTP ----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                method, target, body = await asyncio.wait_for(self._read_request(reader), Config.REQUEST_TIMEOUT)
+                status, payload, headers = await self._route(method, target, body)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                status, payload, headers = HTTPStatus.BAD_REQUEST, {'error': str(e) or 'bad request'}, {}
+            except Exception as e:
+                print(f"❌ Service error: {e}")
+                status, payload, headers = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}, {}
+            await self._respond(writer, status, payload, headers)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise ValueError("malformed request line")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', '0'))
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, body
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, object, Dict]:
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+
+        if parts == ['health'] and method == 'GET':
+            return HTTPStatus.OK, self._health(), {}
+        if parts == ['recipes'] and method == 'POST':
+            return self._handle_submit(body)
+        if len(parts) in (2, 3) and parts[0] == 'recipes' and method == 'GET':
+            job = self._jobs.get(parts[1])
+            if job is None:
+                return HTTPStatus.NOT_FOUND, {'error': 'unknown job'}, {}
+            if len(parts) == 2:
+                return HTTPStatus.OK, job, {}
+            if parts[2] == 'result':
+                return await self._handle_result(job, query)
+        return HTTPStatus.NOT_FOUND, {'error': 'not found'}, {}
+
+    def _handle_submit(self, body: bytes) -> Tuple[HTTPStatus, object, Dict]:
+        try:
+            request = json.loads(body or b'{}')
+        except json.JSONDecodeError:
+            raise ValueError("body must be JSON")
+        keyword = request.get('keyword') if isinstance(request, dict) else None
+        if not isinstance(keyword, str) or not keyword.strip():
+            raise ValueError("'keyword' is required")
+
+        job, coalesced = self.submit(keyword.strip(), force=bool(request.get('force')))
+        if job is None:
+            return (HTTPStatus.TOO_MANY_REQUESTS, {'error': 'queue full'},
+                    {'Retry-After': str(self._retry_after())})
+        headers = {'Location': f"/recipes/{job['id']}"}
+        return HTTPStatus.ACCEPTED, dict(job, coalesced=coalesced), headers
+
+    async def _handle_result(self, job: Dict, query: Dict) -> Tuple[HTTPStatus, object, Dict]:
+        wait = min(float(query.get('wait', ['0'])[0]), MAX_WAIT_SECONDS)
+        if wait > 0 and job['status'] in (STATUS_PENDING, STATUS_RUNNING):
+            try:
+                await asyncio.wait_for(self._finished[job['id']].wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+        if job['status'] in (STATUS_PENDING, STATUS_RUNNING):
+            return HTTPStatus.ACCEPTED, job, {'Retry-After': str(self._retry_after())}
+        if job['status'] == STATUS_FAILED:
+            # The generation failed, not the server; the body is the job, as from the status endpoint
+            return HTTPStatus.CONFLICT, job, {}
+
+        loop = asyncio.get_running_loop()
+        try:
+            if query.get('format', [''])[0] == 'json':
+                data = await loop.run_in_executor(
+                    None, FileManager.load_recipe_data, FileManager.data_path(job['filename'])
+                )
+                return HTTPStatus.OK, data, {}
+            html = await loop.run_in_executor(None, self._read_file, job['filename'])
+        except FileNotFoundError:
+            return HTTPStatus.GONE, {'error': 'recipe file no longer exists'}, {}
+        return HTTPStatus.OK, html, {'Content-Type': 'text/html; charset=utf-8'}
+
+    def _health(self) -> Dict:
+        counts = {status: 0 for status in (STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED)}
+        for job in self._jobs.values():
+            counts[job['status']] += 1
+        return {
+            'queued': self._queue.qsize(),
+            'queue_size': self.queue_size,
+            'workers': self.workers,
+            'jobs': counts
+        }
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload, headers: Dict):
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            headers = dict({'Content-Type': 'application/json'}, **headers)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines += [f"Content-Length: {len(body)}", "Connection: close", "", ""]
+        writer.write('\r\n'.join(lines).encode('latin-1') + body)
+        await writer.drain()
@@ -1,95 +1,366 @@
-import os
-import json
+import contextvars
+import threading
 from datetime import datetime
-from typing import Dict, Optional, List
-from jinja2 import Environment, FileSystemLoader
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, List, Tuple
 
-from services.gemini_service import GeminiService
-from services.pixabay_service import PixabayService
 from utils.validators import ContentValidator
 from utils.file_manager import FileManager
+from utils.generation_log import GenerationLog
+from utils.job_store import JobStore
+from utils.lazy import lazy_property
+from utils.metrics import metrics
 from config.settings import Config
 
 class RecipeGenerator:
-    def __init__(self):
-        self.gemini = GeminiService()
-        self.pixabay = PixabayService()
+    """Runs the generation phases for one keyword at a time (thread-safe).
+
+    API clients and the template are built on first use, and their modules
+    (google-generativeai, requests, jinja2) are imported then too. Importing
+    this module and constructing the generator stay cheap for short-lived
+    processes and for runs that never call an API.
+    """
+
+    def __init__(self, job_store=None):
         self.validator = ContentValidator()
         self.file_manager = FileManager()
-        # Tối ưu hóa 1: Tải template một lần duy nhất
-        template_dir = 'templates'
-        self.env = Environment(loader=FileSystemLoader(template_dir))
-        self.template = self.env.get_template('recipe_body.html')
+        self.generation_log = GenerationLog()
+        # Optional JobStore: tracks job status and checkpoints each paid phase
+        self.job_store = job_store
+        # (keyword key, phase) -> output of a batched call, consumed by _checkpointed
+        self._prefetched: Dict[Tuple[str, str], Any] = {}
+        self._prefetched_lock = threading.Lock()
+
+    @lazy_property
+    def gemini(self):
+        from services.gemini_service import GeminiService
+        return GeminiService()
+
+    @lazy_property
+    def pixabay(self):
+        from services.pixabay_service import PixabayService
+        return PixabayService()
+
+    @lazy_property
+    def image_pipeline(self):
+        if not Config.LOCAL_IMAGES:
+            return None
+        from services.image_pipeline import ImagePipeline
+        pipeline = ImagePipeline()
+        if not pipeline.available:
+            print("⚠️ LOCAL_IMAGES is enabled but Pillow is not installed; images will be hotlinked")
+            return None
+        return pipeline
+
+    @lazy_property
+    def template(self):
+        # Tối ưu hóa 1: Tải template một lần duy nhất (bytecode cached on disk across processes)
+        from utils.templates import load_recipe_template
+        return load_recipe_template()
 
     def generate_recipe(self, keyword: str) -> Optional[str]:
         """Main method to generate complete recipe"""
+        if self.job_store:
+            self.job_store.start(keyword)
+        try:
+            with metrics.trace('generate_recipe', keyword=keyword) as trace:
+                filename = self._generate_recipe(keyword, trace)
+                metrics.set(success=filename is not None)
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, Exception):
+                self._log_failure(keyword, error)
+            if self.job_store:
+                self.job_store.fail(keyword, error)
+            raise
+        if not filename:
+            self._log_failure(keyword, "generation returned no output")
+        if self.job_store:
+            if filename:
+                self.job_store.complete(keyword, filename)
+            else:
+                self.job_store.fail(keyword, "generation returned no output")
+        return filename
+
+    def prefetch(self, keywords: List[str]):
+        """Fetch image keywords and alt texts for many keywords with one batched call each.
+
+        Results are picked up by the image branch of each keyword's generation
+        instead of a call per keyword. Keywords the batched calls miss, and
+        phases that are already checkpointed, are left to the normal pipeline.
+        """
+        if Config.GEMINI_FUSED_MODE:
+            return
+        with metrics.trace('prefetch', keywords=len(keywords)):
+            for phase, fetch in (('image_keyword', self.gemini.extract_image_keywords_batch),
+                                 ('alt_texts', self.gemini.generate_alt_texts_batch)):
+                pending = [keyword for keyword in keywords if not self._has_output(keyword, phase)]
+                if not pending:
+                    continue
+                print(f"📦 Prefetching {phase} for {len(pending)} keywords...")
+                with metrics.span(f'prefetch.{phase}'):
+                    values = fetch(pending, fallback=False)
+                with self._prefetched_lock:
+                    for keyword, value in values.items():
+                        self._prefetched[(JobStore.make_key(keyword), phase)] = value
+
+    def _has_output(self, keyword: str, phase: str) -> bool:
+        with self._prefetched_lock:
+            if (JobStore.make_key(keyword), phase) in self._prefetched:
+                return True
+        return bool(self.job_store) and self.job_store.load_checkpoint(keyword, phase) is not None
+
+    def _generate_recipe(self, keyword: str, trace) -> Optional[str]:
         print(f"🍳 Starting recipe generation for: '{keyword}'")
         
+        if Config.GEMINI_FUSED_MODE:
+            prepared = self._prepare_fused(keyword)
+        else:
+            prepared = self._prepare_concurrent(keyword)
+        if prepared is None:
+            return None
+        recipe_data, image_urls, alt_texts = prepared
+        
+        # Phase 7: Prepare final data
+        print("🔄 Phase 7: Consolidating data...")
+        # Everything the template needs except derived values; stored next to the HTML
+        recipe_record = {
+            'recipe': recipe_data,
+            'images': self._build_images(image_urls, alt_texts),
+            'keyword': keyword
+        }
+        
+        # Phases 8-9: Generate HTML, streamed straight into the output file
+        print("📝 Phases 8-9: Rendering HTML to file...")
+        with metrics.span('render'):
+            filename = self._render_to_file(keyword, recipe_record)
+        if not filename:
+            print("❌ Failed to generate HTML")
+            return None
+        
+        # Phase 10: Log generation stats
+        self._log_generation_stats(keyword, recipe_data, image_urls, filename, trace.summary())
+        
+        print(f"🎉 Recipe generated successfully: {filename}")
+        return filename
+
+    def _prepare_concurrent(self, keyword: str) -> Optional[Tuple[Dict, List[str], List[str]]]:
+        """Phases 1-6 as two independent branches"""
+        if not Config.CONCURRENT_PHASES:
+            recipe_data = self._prepare_content(keyword)
+            if not recipe_data:
+                return None
+            image_urls, alt_texts = self._prepare_images(keyword)
+            return recipe_data, image_urls, alt_texts
+        
+        # Phases 1, 2 and 6 (images) do not depend on phases 3-5 (content),
+        # so the image branch runs in a worker thread while content is generated here.
+        # If content fails, the branch stops at its next phase instead of paying for the rest.
+        cancelled = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Copy the context so the branch's spans land in this recipe's trace
+            images_future = executor.submit(
+                contextvars.copy_context().run, self._prepare_images, keyword, cancelled
+            )
+            recipe_data = None
+            try:
+                recipe_data = self._prepare_content(keyword)
+            finally:
+                # Also reached when content raises (including Ctrl-C)
+                if not recipe_data:
+                    cancelled.set()
+            if not recipe_data:
+                return None
+            image_urls, alt_texts = images_future.result()
+        return recipe_data, image_urls, alt_texts
+
+    def _prepare_fused(self, keyword: str) -> Optional[Tuple[Dict, List[str], List[str]]]:
+        """Phases 1-6 with a single structured Gemini call replacing phases 1, 3, 5 and 6"""
+        print("🤖 Phases 1, 3, 5, 6: Generating image keyword, recipe and alt texts in one call...")
+        with metrics.span('fused'):
+            fused = self._checkpointed(keyword, 'fused', lambda: self.gemini.generate_fused(keyword))
+        if not fused:
+            print("❌ Failed to generate recipe content")
+            return None
+        print(f"   └── Image keyword: '{fused['image_keyword']}'")
+        
+        # Phase 2: Search for images
+        print("📸 Phase 2: Searching for images...")
+        with metrics.span('image_search'):
+            image_urls = self._checkpointed(
+                keyword, 'image_search', lambda: self.pixabay.search_food_images(fused['image_keyword'])
+            )
+        print(f"   └── Found {len(image_urls)} images")
+        
+        # Phase 4: Auto-validate content
+        print("✅ Phase 4: Validating content...")
+        recipe_data = self._validate(keyword, fused['recipe'])
+        
+        return recipe_data, image_urls, fused['alt_texts']
+
+    def _prepare_images(self, keyword: str,
+                        cancelled: Optional[threading.Event] = None) -> Optional[Tuple[List[str], List[str]]]:
+        """Image branch: phases 1, 2 and 6; returns None if `cancelled` is set between phases"""
         # Phase 1: Extract image search keyword
         print("🔍 Phase 1: Extracting image keyword...")
-        image_keyword = self.gemini.extract_image_keyword(keyword)
+        with metrics.span('image_keyword'):
+            image_keyword = self._checkpointed(
+                keyword, 'image_keyword', lambda: self.gemini.extract_image_keyword(keyword)
+            )
         print(f"   └── Image keyword: '{image_keyword}'")
+        if cancelled is not None and cancelled.is_set():
+            return None
         
-        # Phase 2: Search for images
+        # Phase 2: Search for images (allocates images in the index)
         print("📸 Phase 2: Searching for images...")
-        image_urls = self.pixabay.search_food_images(image_keyword)
+        with metrics.span('image_search'):
+            image_urls = self._checkpointed(
+                keyword, 'image_search', lambda: self.pixabay.search_food_images(image_keyword)
+            )
         print(f"   └── Found {len(image_urls)} images")
+        if cancelled is not None and cancelled.is_set():
+            return None
         
+        # Phase 6: Generate alt texts
+        print("🏷️ Phase 6: Generating alt texts...")
+        with metrics.span('alt_texts'):
+            alt_texts = self._checkpointed(
+                keyword, 'alt_texts', lambda: self.gemini.generate_alt_texts(keyword, image_urls)
+            )
+        
+        return image_urls, alt_texts
+
+    def _prepare_content(self, keyword: str) -> Optional[Dict]:
+        """Content branch: phases 3, 4 and 5"""
         # Phase 3: Generate base recipe content
         print("🤖 Phase 3: Generating recipe content...")
-        recipe_data = self.gemini.generate_recipe_content(keyword)
+        with metrics.span('recipe_content'):
+            recipe_data = self._checkpointed(
+                keyword, 'recipe_content', lambda: self.gemini.generate_recipe_content(keyword)
+            )
         if not recipe_data:
             print("❌ Failed to generate recipe content")
             return None
         
         # Phase 4: Auto-validate content
         print("✅ Phase 4: Validating content...")
-        recipe_data = self.validator.validate_and_fix(recipe_data)
+        recipe_data = self._validate(keyword, recipe_data)
         
         # Phase 5: Enhance for SEO
         print("✨ Phase 5: Enhancing content for SEO...")
-        enhanced_data = self.gemini.enhance_content_for_seo(recipe_data, keyword)
+        if Config.SEO_ENHANCEMENT_MODE == 'patch':
+            keyword_count = self.validator.count_keyword_appearances(recipe_data, keyword)
+            if keyword_count >= Config.KEYWORD_APPEARANCE_TARGET:
+                print(f"   └── Skipped: keyword already appears {keyword_count} times")
+                return recipe_data
+        with metrics.span('seo'):
+            enhanced_data = self._checkpointed(
+                keyword, 'seo', lambda: self.gemini.enhance_content_for_seo(recipe_data, keyword)
+            )
         if enhanced_data:
             recipe_data = enhanced_data
             print("   └── Content enhanced successfully")
         else:
             print("   └── Using base content (enhancement failed)")
         
-        # Phase 6: Generate alt texts
-        print("🏷️ Phase 6: Generating alt texts...")
-        alt_texts = self.gemini.generate_alt_texts(keyword, image_urls)
-        
-        # Phase 7: Prepare final data
-        print("🔄 Phase 7: Consolidating data...")
-        final_data = {
-            'recipe': recipe_data,
-            'images': {
-                'hero': {'url': image_urls[0], 'alt': alt_texts[0]},
-                'ingredients': {'url': image_urls[1], 'alt': alt_texts[1]},
-                'process': {'url': image_urls[2], 'alt': alt_texts[2]}
-            },
-            'keyword': keyword,
-            'stars': self._generate_stars(recipe_data.get('rating', 5.0))
-        }
-        
-        # Phase 8: Generate HTML
-        print("📝 Phase 8: Generating HTML...")
-        html_content = self._render_template(final_data)
-        if not html_content:
-            print("❌ Failed to generate HTML")
-            return None
+        return recipe_data
+
+    def _validate(self, keyword: str, recipe_data: Dict) -> Dict:
+        """Regenerate only the sections the validator flags, then apply local fixes"""
+        with metrics.span('validation'):
+            findings = self.validator.find_problems(recipe_data)
+        for i, finding in enumerate(findings):
+            branch = "└──" if i == len(findings) - 1 else "├──"
+            print(f"   {branch} {finding['section']}: {finding['message']}")
         
-        # Phase 9: Save file
-        print("💾 Phase 9: Saving file...")
-        filename = self.file_manager.save_recipe(html_content, keyword)
+        if findings and Config.SECTION_REPAIR and self.validator.sections_to_regenerate(findings):
+            print("🩹 Regenerating flagged sections...")
+            with metrics.span('section_repair'):
+                patch = self._checkpointed(
+                    keyword, 'section_repair',
+                    lambda: self.gemini.regenerate_sections(recipe_data, keyword, findings)
+                )
+            if patch:
+                recipe_data = self.validator.apply_patch(recipe_data, patch)
+                remaining = self.validator.find_problems(recipe_data)
+                print(f"   └── Repaired {len(findings) - len(remaining)}/{len(findings)} problems")
+            else:
+                print("   └── Regeneration failed, using local fixes")
         
-        # Phase 10: Log generation stats
-        self._log_generation_stats(keyword, recipe_data, image_urls, filename)
+        with metrics.span('validation'):
+            return self.validator.validate_and_fix(recipe_data)
+
+    def _build_images(self, image_urls: List[str], alt_texts: List[str]) -> Dict:
+        """Template image slots; points them at local resized variants when the image pipeline is on"""
+        images = {
+            'hero': {'url': image_urls[0], 'alt': alt_texts[0]},
+            'ingredients': {'url': image_urls[1], 'alt': alt_texts[1]},
+            'process': {'url': image_urls[2], 'alt': alt_texts[2]}
+        }
+        if not self.image_pipeline:
+            return images
         
-        print(f"🎉 Recipe generated successfully: {filename}")
-        return filename
+        print("🖼️ Localizing images...")
+        with metrics.span('images'):
+            assets = self.image_pipeline.localize(image_urls[:len(images)])
+        # Images that failed to download keep their original URL
+        for image, asset in zip(images.values(), assets):
+            if asset:
+                image.update(asset)
+        print(f"   └── Localized {sum(1 for asset in assets if asset)}/{len(assets)} images")
+        return images
+
+    def _checkpointed(self, keyword: str, phase: str, produce: Callable[[], Any]) -> Any:
+        """Return the phase's saved or prefetched output if there is one, otherwise run and save it"""
+        if self.job_store:
+            saved = self.job_store.load_checkpoint(keyword, phase)
+            if saved is not None:
+                print(f"   └── Resumed '{phase}' from checkpoint")
+                return saved
+        with self._prefetched_lock:
+            value = self._prefetched.pop((JobStore.make_key(keyword), phase), None)
+        if value is not None:
+            print(f"   └── Using prefetched '{phase}'")
+        else:
+            value = produce()
+        # Failed phases return None/empty and are retried on resume
+        if value and self.job_store:
+            self.job_store.save_checkpoint(keyword, phase, value)
+        return value
+
+    @classmethod
+    def template_context(cls, recipe_record: Dict, root: str = '') -> Dict:
+        """Template variables for a stored recipe record.
 
-    def _generate_stars(self, rating: float) -> str:
+        `root` leads from the page back to the output directory; it is prefixed to
+        local image URLs, which are stored relative to that directory.
+        """
+        context = {
+            **recipe_record,
+            'stars': cls._generate_stars(recipe_record['recipe'].get('rating', 5.0))
+        }
+        if root:
+            context['images'] = {
+                slot: cls._relocate_image(image, root) for slot, image in recipe_record['images'].items()
+            }
+        return context
+
+    @staticmethod
+    def _relocate_image(image: Dict, root: str) -> Dict:
+        """Copy of an image slot with output-relative URLs made relative to the page"""
+        def relocate(url: str) -> str:
+            if not url or url.startswith('/') or '://' in url:
+                return url
+            return root + url
+
+        image = dict(image, url=relocate(image['url']))
+        for key in ('srcset', 'webp_srcset'):
+            if image.get(key):
+                image[key] = ', '.join(relocate(candidate.strip()) for candidate in image[key].split(','))
+        return image
+
+    @staticmethod
+    def _generate_stars(rating: float) -> str:
         """Generate star display from rating"""
         full_stars = int(rating)
         half_star = 1 if rating % 1 >= 0.5 else 0
@@ -97,20 +368,25 @@ class RecipeGenerator:
         # Sử dụng ký tự '½' cho nửa sao
         return '★' * full_stars + '½' * half_star + '☆' * empty_stars
 
-    def _render_template(self, data: Dict) -> Optional[str]:
-        """Render HTML template with data"""
+    def _render_to_file(self, keyword: str, recipe_record: Dict) -> Optional[str]:
+        """Stream the rendered template into the output file without building the page in memory"""
         try:
+            filepath = self.file_manager.recipe_path(keyword)
+            root = self.file_manager.relative_root(filepath, self.file_manager.output_dir)
+            data = self.template_context(recipe_record, root)
             # Tối ưu hóa 1: Dùng template đã được tải sẵn
-            return self.template.render(**data)
+            return self.file_manager.save_recipe(self.template.generate(**data), keyword, recipe_record, filepath)
         except Exception as e:
             print(f"❌ Template rendering error: {e}")
             return None
 
-    def _log_generation_stats(self, keyword: str, recipe_data: Dict, image_urls: List, filename: str):
+    def _log_generation_stats(self, keyword: str, recipe_data: Dict, image_urls: List, filename: str,
+                              timing: Optional[Dict] = None):
         """Log generation statistics to console and file"""
         stats = {
             'timestamp': datetime.now().isoformat(),
             'keyword': keyword,
+            'success': True,
             'filename': filename,
             'ingredients_count': len(recipe_data.get('ingredients', [])),
             'steps_count': len(recipe_data.get('instructions', [])),
@@ -120,6 +396,10 @@ class RecipeGenerator:
             'rating': recipe_data.get('rating'),
             'difficulty': recipe_data.get('difficulty')
         }
+        if timing:
+            stats['duration_ms'] = timing['duration_ms']
+            stats['phases_ms'] = timing['phases_ms']
+            stats['gemini'] = timing['gemini']
         
         # In ra console (như cũ)
         print(f"📊 Generation Stats:")
@@ -128,12 +408,20 @@ class RecipeGenerator:
         print(f"   ├── FAQs: {stats['faqs_count']}")
         print(f"   ├── Tips: {stats['tips_count']}")
         print(f"   ├── Images: {stats['images_retrieved']}")
-        print(f"   └── Rating: {stats['rating']}/5.0")
+        print(f"   ├── Rating: {stats['rating']}/5.0")
+        if timing:
+            gemini = timing['gemini']
+            print(f"   ├── Gemini: {gemini.get('calls', 0)} calls, "
+                  f"{gemini.get('prompt_tokens', 0)} prompt + {gemini.get('response_tokens', 0)} response tokens")
+        print(f"   └── Duration: {stats.get('duration_ms', 0) / 1000:.1f}s")
         
-        # Tối ưu hóa 2: Ghi log vào file
-        log_file_path = os.path.join(Config.LOG_DIR, 'generation_log.jsonl')
-        try:
-            with open(log_file_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(stats) + '\n')
-        except Exception as e:
-            print(f"⚠️ Could not write to log file: {e}")
+        # Tối ưu hóa 2: Ghi log vào file (buffered, rotated)
+        self.generation_log.append(stats)
+
+    def _log_failure(self, keyword: str, error: str):
+        self.generation_log.append({
+            'timestamp': datetime.now().isoformat(),
+            'keyword': keyword,
+            'success': False,
+            'error': error
+        })
@@ -0,0 +1,86 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import Config
+from core.recipe_generator import RecipeGenerator
+from utils.file_manager import FileManager, compression_formats
+from utils.manifest import MANIFEST_NAME, Manifest
+from utils.templates import load_recipe_template
+
+# Template, output root and precompressed formats, set once per worker process
+_template = None
+_output_dir = None
+_formats = []
+
+
+def _init_worker(template_dir: str, output_dir: str, formats: List[str]):
+    global _template, _output_dir, _formats
+    _template = load_recipe_template(template_dir)
+    _output_dir = output_dir
+    _formats = formats
+
+
+def _rerender_one(data_path: str) -> Tuple[str, str, Optional[str], Optional[Tuple]]:
+    """Re-render one stored recipe; returns (html_path, status, error, manifest fields if changed)"""
+    html_path = os.path.splitext(data_path)[0] + '.html'
+    try:
+        record = FileManager.load_recipe_data(data_path)
+        root = FileManager.relative_root(html_path, _output_dir)
+        chunks = _template.generate(**RecipeGenerator.template_context(record, root))
+        changed = FileManager.write_atomic(html_path, chunks, only_if_changed=True)
+        # Unchanged pages still get siblings for formats enabled since they were published
+        sha256, size, formats = FileManager.precompress(html_path, _formats, force=changed)
+        published = (record['keyword'], sha256, size, formats) if changed else None
+        return html_path, 'changed' if changed else 'unchanged', None, published
+    except Exception as e:
+        return html_path, 'error', str(e), None
+
+
+class Rerenderer:
+    """Re-apply the current template to every stored recipe without any API calls"""
+
+    def __init__(self, output_dir: str = None, template_dir: str = 'templates', workers: int = None):
+        self.output_dir = output_dir or Config.OUTPUT_DIR
+        self.template_dir = template_dir
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+    def run(self) -> List[Dict]:
+        """Render every JSON sidecar in the output directory across a process pool"""
+        data_paths = FileManager.list_recipe_data(self.output_dir)
+        if not data_paths:
+            return []
+
+        start = time.monotonic()
+        print(f"🔁 Re-rendering {len(data_paths)} recipes")
+        # Only this process appends to the manifest
+        manifest = Manifest(os.path.join(self.output_dir, MANIFEST_NAME))
+        initargs = (self.template_dir, self.output_dir, compression_formats())
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as executor:
+            # Small chunks amortise the inter-process round trip on large corpora
+            chunksize = max(1, min(64, len(data_paths) // (4 * self.workers)))
+            for html_path, status, error, published in executor.map(_rerender_one, data_paths, chunksize=chunksize):
+                if published:
+                    keyword, sha256, size, formats = published
+                    manifest.append(keyword, html_path, sha256, size, formats,
+                                    superseded=manifest.is_superseded(keyword, html_path))
+                results.append({'filename': html_path, 'status': status, 'error': error})
+        print(f"   └── Done in {time.monotonic() - start:.1f}s")
+        return results
+
+    @staticmethod
+    def print_summary(results: List[Dict]):
+        """Print changed/unchanged/error counts and any failures"""
+        counts = {'changed': 0, 'unchanged': 0, 'error': 0}
+        for result in results:
+            counts[result['status']] += 1
+
+        print(f"\n{'='*50}")
+        print(f"📊 Re-render Summary: {counts['changed']} rewritten, "
+              f"{counts['unchanged']} unchanged, {counts['error']} failed")
+        for result in results:
+            if result['status'] == 'error':
+                print(f"   ❌ {result['filename']} → {result['error']}")
+        print(f"{'='*50}")
@@ -2,66 +2,82 @@
 """
 Recipe AI Generator
 Generates comprehensive recipe blog posts using Gemini AI and Pixabay images.
+
+Usage:
+    python main.py                                  # interactive mode
+    python main.py batch keywords.txt [--workers N] # batch mode (use '-' for stdin)
+    python main.py resume [--workers N]             # finish interrupted or failed batch jobs
+    python main.py rerender [--workers N]           # rebuild all HTML from stored recipe JSON
+    python main.py serve [--port N] [--workers N]   # HTTP generation service
+    python main.py manifest [--since DATE]          # list published files for deploy syncs
+    python main.py --dry-run [batch keywords.txt]   # check configuration, no API clients
+    python main.py --cache refresh ...              # ignore cached Gemini responses
 """
 
 import os
 import sys
+import argparse
+import importlib.util
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
 from config.settings import Config
-from core.recipe_generator import RecipeGenerator
+from utils.metrics import metrics
 
-def main():
-    """Main application entry point"""
-    print("🍽️ Recipe AI Generator")
-    print("=" * 50)
-    
+# Commands import what they need when they run, so startup and --dry-run stay fast
+if TYPE_CHECKING:
+    from core.recipe_generator import RecipeGenerator
+
+def prepare_environment() -> bool:
+    """Validate configuration and create output directories"""
     # Validate configuration
     try:
         Config.validate()
     except ValueError as e:
         print(f"❌ Configuration Error: {e}")
         print("Please check your .env file and ensure all required API keys are set.")
-        return
-    
+        return False
+
     # Create output directories
     for path in [Config.OUTPUT_DIR, Config.LOG_DIR]:
         if os.path.exists(path):
             if os.path.isfile(path):
                 print(f"❌ Cannot create directory '{path}': a file with the same name exists. Please remove or rename the file.")
-                return
+                return False
             # Directory exists, skip creation
         else:
             os.makedirs(path, exist_ok=True)
-    
-    # Initialize generator
-    generator = RecipeGenerator()
-    
+
+    return True
+
+def run_interactive(generator: 'RecipeGenerator'):
+    """Interactive keyword prompt loop"""
     print("Ready to generate recipes! Type 'quit' to exit.\n")
-    
+
     while True:
         try:
             # Get user input
             keyword = input("Enter recipe keyword: ").strip()
-            
+
             if keyword.lower() in ['quit', 'exit', 'q']:
                 print("👋 Goodbye!")
                 break
-            
+
             if not keyword:
                 print("❌ Please enter a valid keyword")
                 continue
-            
+
             print(f"\n{'='*50}")
-            
+
             # Generate recipe
             result = generator.generate_recipe(keyword)
-            
+
             if result:
                 print(f"\n✅ Success! Recipe saved to: {result}")
             else:
                 print(f"\n❌ Failed to generate recipe for '{keyword}'")
-            
+
             print(f"{'='*50}\n")
-            
+
         except KeyboardInterrupt:
             print("\n\n👋 Interrupted by user. Goodbye!")
             break
@@ -69,5 +85,292 @@ def main():
             print(f"\n❌ Unexpected error: {e}")
             continue
 
+def read_batch_keywords(source: str, force: bool = False, keep_duplicates: bool = False) -> Optional[List[str]]:
+    """Keywords from a file (or stdin) with near-duplicates dropped; None if there is nothing to read"""
+    from core.batch_runner import BatchRunner
+    from utils.keyword_dedup import KeywordDeduplicator
+
+    try:
+        if source == '-':
+            keywords = BatchRunner.read_keywords(sys.stdin)
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                keywords = BatchRunner.read_keywords(f)
+    except OSError as e:
+        print(f"❌ Could not read keywords: {e}")
+        return None
+
+    if not keywords:
+        print("❌ No keywords to process")
+        return None
+
+    if Config.KEYWORD_DEDUP:
+        # Near-duplicates are dropped before any API call; --force only checks within the batch
+        deduplicator = KeywordDeduplicator()
+        if not force:
+            deduplicator.load_corpus()
+        unique, duplicates = deduplicator.filter(keywords)
+        if duplicates:
+            deduplicator.print_report(duplicates, skipped=not keep_duplicates)
+            if not keep_duplicates:
+                keywords = unique
+    return keywords
+
+def run_batch(generator: 'RecipeGenerator', source: str, workers: int, force: bool = False,
+              keep_duplicates: bool = False) -> int:
+    """Generate recipes for every keyword in a file (or stdin) concurrently"""
+    keywords = read_batch_keywords(source, force, keep_duplicates)
+    if keywords is None:
+        return 1
+
+    keywords, done = generator.job_store.enqueue(keywords, force=force)
+    if done:
+        print(f"⏭️ Skipping {len(done)} keywords already generated (use --force to regenerate)")
+    if not keywords:
+        print("✅ Nothing left to generate")
+        return 0
+
+    return run_jobs(generator, keywords, workers)
+
+def run_resume(generator: 'RecipeGenerator', workers: int) -> int:
+    """Continue every pending, interrupted or failed job from its last checkpoint"""
+    keywords = generator.job_store.unfinished()
+    if not keywords:
+        print("✅ No unfinished jobs")
+        return 0
+    print(f"🔁 Resuming {len(keywords)} unfinished jobs")
+    return run_jobs(generator, keywords, workers)
+
+def run_jobs(generator: 'RecipeGenerator', keywords, workers: int) -> int:
+    """Run job-tracked keywords through the batch runner and print the summary"""
+    from core.batch_runner import BatchRunner
+
+    runner = BatchRunner(generator, workers)
+    try:
+        results = runner.run(keywords)
+    except KeyboardInterrupt:
+        print("\n\n👋 Batch interrupted by user. Run 'python main.py resume' to continue.")
+        return 130
+
+    runner.print_summary(results)
+    return 0 if all(r['success'] for r in results) else 1
+
+def run_rerender(workers: int) -> int:
+    """Re-apply the current template to every stored recipe, rewriting only changed files"""
+    from core.rerenderer import Rerenderer
+
+    rerenderer = Rerenderer(workers=workers)
+    results = rerenderer.run()
+    if not results:
+        print(f"❌ No stored recipe data found in {Config.OUTPUT_DIR}")
+        return 1
+    rerenderer.print_summary(results)
+    return 0 if all(r['status'] != 'error' for r in results) else 1
+
+def run_manifest(since: Optional[str], output: Optional[str], compact: bool) -> int:
+    """List published files from the manifest, optionally only those changed since a date"""
+    from utils.file_manager import FileManager
+    from utils.manifest import MANIFEST_NAME, Manifest
+
+    manifest = Manifest(os.path.join(Config.OUTPUT_DIR, MANIFEST_NAME))
+    if compact:
+        dropped = manifest.compact()
+        print(f"🗜️ Compacted manifest: dropped {dropped} stale entries")
+        return 0
+
+    try:
+        since_time = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        print(f"❌ Invalid --since date: {since} (use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)")
+        return 1
+
+    entries = manifest.changed_since(since_time)
+    paths = []
+    for entry in entries:
+        paths.append(entry['path'])
+        paths.extend(f"{entry['path']}.{fmt}" for fmt in entry['compressed'])
+    if output:
+        # Paths are relative to OUTPUT_DIR, e.g. for rsync --files-from
+        FileManager.write_atomic(output, ''.join(f"{path}\n" for path in paths))
+        print(f"📋 {len(entries)} pages ({len(paths)} files) written to {output}")
+    else:
+        for path in paths:
+            print(path)
+    return 0
+
+def run_stats(since: Optional[str], output: Optional[str]) -> int:
+    """Aggregate the generation log (every rotated segment) in one streaming pass"""
+    import json
+    from utils.generation_log import GenerationLog
+    from utils.generation_stats import GenerationStats
+
+    try:
+        since_time = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        print(f"❌ Invalid --since date: {since} (use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)")
+        return 1
+
+    stats = GenerationStats(since_time).add_all(GenerationLog.read(Config.LOG_DIR, since_time))
+    stats.print_report()
+    if output:
+        from utils.file_manager import FileManager
+        FileManager.write_atomic(output, json.dumps(stats.to_dict(), ensure_ascii=False, indent=2))
+        print(f"💾 Aggregates written to {output}")
+    return 0
+
+def run_service(generator: 'RecipeGenerator', host: str, port: int, workers: int, queue_size: int) -> int:
+    """Serve submit/status/result endpoints until interrupted"""
+    import asyncio
+    from core.generation_service import GenerationService
+
+    service = GenerationService(generator, workers, queue_size)
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        print("\n\n👋 Service stopped. Run 'python main.py resume' to finish interrupted jobs.")
+    except OSError as e:
+        print(f"❌ Could not start service on {host}:{port}: {e}")
+        return 1
+    return 0
+
+def run_config_check(args) -> int:
+    """Validate configuration and show what would run, without building any API client"""
+    from utils.templates import RECIPE_TEMPLATE
+
+    try:
+        Config.validate()
+    except ValueError as e:
+        print(f"❌ Configuration Error: {e}")
+        return 1
+
+    template_path = os.path.join('templates', RECIPE_TEMPLATE)
+    if not os.path.exists(template_path):
+        print(f"❌ Template not found: {template_path}")
+        return 1
+
+    task_models = Config.gemini_task_models()
+    overrides = ', '.join(f"{task}={model}" for task, model in task_models.items()) or 'none'
+    local_images = 'off'
+    if Config.LOCAL_IMAGES:
+        local_images = 'on' if importlib.util.find_spec('PIL') else 'on, but Pillow is not installed'
+    print("🔎 Dry run: configuration OK")
+    print(f"   ├── Gemini keys: {len(Config.gemini_api_keys())}")
+    print(f"   ├── Model: {Config.GEMINI_MODEL} (task overrides: {overrides})")
+    print(f"   ├── Fused mode: {'on' if Config.GEMINI_FUSED_MODE else 'off'}, cache: {Config.GEMINI_CACHE_MODE}")
+    print(f"   ├── Local images: {local_images}")
+    print(f"   └── Output: {Config.OUTPUT_DIR}")
+
+    if args.command == 'batch':
+        keywords = read_batch_keywords(args.source, args.force, args.keep_duplicates)
+        if keywords is None:
+            return 1
+        done = []
+        if not args.force and os.path.exists(Config.JOB_STORE_PATH):
+            from utils.job_store import JobStore
+            job_store = JobStore(Config.JOB_STORE_PATH)
+            done = [keyword for keyword in keywords if job_store.finished_file(keyword)]
+        print(f"📋 Would generate {len(keywords) - len(done)} keywords, skip {len(done)} already generated")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Recipe AI Generator")
+    parser.add_argument('--cache', choices=['use', 'refresh', 'off'], default=None,
+                        help="Gemini response cache: use it, refresh it (skip reads) or turn it off "
+                             f"(default: {Config.GEMINI_CACHE_MODE}, or refresh with batch --force)")
+    parser.add_argument('--metrics', default=Config.METRICS_EXPORTERS,
+                        help="Comma-separated metrics exporters: text, json (writes METRICS_PATH)")
+    parser.add_argument('--fused', action='store_true', default=Config.GEMINI_FUSED_MODE,
+                        help="Generate image keyword, recipe and alt texts in one structured Gemini call")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Check configuration (and list what a batch would generate) without calling any API")
+    subparsers = parser.add_subparsers(dest='command')
+
+    batch_parser = subparsers.add_parser('batch', help="Generate recipes for a list of keywords")
+    batch_parser.add_argument('source', help="Keyword file, one keyword per line ('-' for stdin)")
+    batch_parser.add_argument('-w', '--workers', type=int, default=Config.BATCH_WORKERS,
+                              help=f"Number of concurrent generations (default: {Config.BATCH_WORKERS})")
+    batch_parser.add_argument('--force', action='store_true',
+                              help="Regenerate keywords that were already generated "
+                                   "(implies --cache refresh unless --cache is given)")
+    batch_parser.add_argument('--keep-duplicates', action='store_true',
+                              help="Report near-duplicate keywords but generate them anyway")
+
+    resume_parser = subparsers.add_parser('resume', help="Finish interrupted or failed batch jobs")
+    resume_parser.add_argument('-w', '--workers', type=int, default=Config.BATCH_WORKERS,
+                               help=f"Number of concurrent generations (default: {Config.BATCH_WORKERS})")
+
+    rerender_parser = subparsers.add_parser('rerender', help="Rebuild all HTML from stored recipe JSON (no API calls)")
+    rerender_parser.add_argument('-w', '--workers', type=int, default=None,
+                                 help="Number of worker processes (default: CPU count)")
+
+    manifest_parser = subparsers.add_parser('manifest', help="List published files from the output manifest")
+    manifest_parser.add_argument('--since', help="Only pages published after this ISO date/time")
+    manifest_parser.add_argument('-o', '--output', help="Write the file list here instead of stdout")
+    manifest_parser.add_argument('--compact', action='store_true',
+                                 help="Drop older lines per page and superseded pages no longer on disk (run while nothing is publishing)")
+
+    stats_parser = subparsers.add_parser('stats', help="Aggregate statistics from the generation log")
+    stats_parser.add_argument('--since', help="Only generations after this ISO date/time")
+    stats_parser.add_argument('-o', '--output', help="Also write the aggregates to this JSON file")
+
+    serve_parser = subparsers.add_parser('serve', help="Run the HTTP generation service")
+    serve_parser.add_argument('--host', default=Config.SERVICE_HOST,
+                              help=f"Interface to listen on (default: {Config.SERVICE_HOST})")
+    serve_parser.add_argument('--port', type=int, default=Config.SERVICE_PORT,
+                              help=f"Port to listen on (default: {Config.SERVICE_PORT})")
+    serve_parser.add_argument('-w', '--workers', type=int, default=Config.SERVICE_WORKERS,
+                              help=f"Number of concurrent generations (default: {Config.SERVICE_WORKERS})")
+    serve_parser.add_argument('--queue-size', type=int, default=Config.SERVICE_QUEUE_SIZE,
+                              help=f"Queued generations before submissions get 429 (default: {Config.SERVICE_QUEUE_SIZE})")
+
+    return parser
+
+def main(argv=None) -> int:
+    """Main application entry point"""
+    args = build_parser().parse_args(argv)
+    Config.GEMINI_CACHE_MODE = args.cache or Config.GEMINI_CACHE_MODE
+    if args.cache is None and getattr(args, 'force', False) and Config.GEMINI_CACHE_MODE == 'use':
+        # Cached responses would reproduce the pages being regenerated
+        Config.GEMINI_CACHE_MODE = 'refresh'
+    Config.GEMINI_FUSED_MODE = args.fused
+    Config.METRICS_EXPORTERS = args.metrics
+
+    print("🍽️ Recipe AI Generator")
+    print("=" * 50)
+
+    if args.dry_run:
+        return run_config_check(args)
+
+    # Re-rendering, the manifest and log stats need no API keys
+    if args.command == 'rerender':
+        return run_rerender(args.workers)
+    if args.command == 'manifest':
+        return run_manifest(args.since, args.output, args.compact)
+    if args.command == 'stats':
+        return run_stats(args.since, args.output)
+
+    if not prepare_environment():
+        return 1
+
+    metrics.configure_exporters()
+
+    from core.recipe_generator import RecipeGenerator
+
+    if args.command in ('batch', 'resume', 'serve'):
+        from utils.job_store import JobStore
+
+        # Jobs are tracked and checkpointed so an interrupted run can be resumed
+        generator = RecipeGenerator(job_store=JobStore(Config.JOB_STORE_PATH))
+        if args.command == 'serve':
+            return run_service(generator, args.host, args.port, args.workers, args.queue_size)
+        if args.command == 'resume':
+            return run_resume(generator, args.workers)
+        return run_batch(generator, args.source, args.workers, args.force, args.keep_duplicates)
+
+    # Initialize generator
+    generator = RecipeGenerator()
+    run_interactive(generator)
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import asyncio
+from typing import Callable, Dict, List, Optional
+from config.settings import Config
+from services.gemini_service import GeminiService
+from services.schemas import (
+    ALT_TEXT_BATCH_SCHEMA, FUSED_SCHEMA, IMAGE_KEYWORD_BATCH_SCHEMA, SEO_PATCH_SCHEMA, section_repair_schema
+)
+from utils.json_stream import StreamMonitor
+from utils.metrics import metrics
+from utils.rate_limiter import AsyncRateLimiter
+from utils.validators import ContentValidator
+
+class AsyncGeminiService(GeminiService):
+    """asyncio variant of GeminiService.
+
+    Exposes the same public methods as coroutines. Every request passes through a
+    shared AsyncRateLimiter, so many in-flight generations on one event loop stay
+    within the combined RPM/TPM quota of the key pool and the concurrency cap.
+    """
+
+    def __init__(self, rate_limiter: AsyncRateLimiter = None):
+        super().__init__()
+        keys = len(self.key_pool)
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(
+            requests_per_minute=Config.GEMINI_RPM * keys,
+            tokens_per_minute=Config.GEMINI_TPM * keys,
+            max_concurrency=Config.GEMINI_MAX_CONCURRENCY
+        )
+
+    async def extract_image_keyword(self, recipe_keyword: str) -> Optional[str]:
+        """Extract optimal image search keyword from recipe keyword"""
+        prompt = self._image_keyword_prompt(recipe_keyword)
+
+        try:
+            return await self._generate_cached_async(prompt, self._clean_image_keyword, 'image_keyword')
+        except Exception as e:
+            print(f"⚠️ Image keyword extraction failed: {e}")
+            return self._fallback_image_keyword(recipe_keyword)
+
+    async def extract_image_keywords_batch(self, recipe_keywords: List[str], fallback: bool = True) -> Dict[str, str]:
+        """Image search keywords for many recipe keywords in one structured call"""
+        recipe_keywords = list(dict.fromkeys(recipe_keywords))
+        if not recipe_keywords:
+            return {}
+        result = await self._make_request_with_retry_async(
+            self._image_keyword_batch_prompt(recipe_keywords), 'image_keyword',
+            response_schema=IMAGE_KEYWORD_BATCH_SCHEMA
+        )
+        image_keywords = self._batch_items(result, recipe_keywords, 'image_keyword', self._batch_image_keyword)
+        missing = self._report_batch('image keywords', recipe_keywords, image_keywords, fallback)
+        if fallback and missing:
+            fallbacks = await asyncio.gather(*(self.extract_image_keyword(keyword) for keyword in missing))
+            image_keywords.update(zip(missing, fallbacks))
+        return image_keywords
+
+    async def generate_recipe_content(self, keyword: str) -> Optional[Dict]:
+        """Generate complete recipe content structure"""
+        return await self._make_request_with_retry_async(
+            self._recipe_content_prompt(keyword), 'recipe_content', stream=Config.GEMINI_STREAMING
+        )
+
+    async def enhance_content_for_seo(self, recipe_data: Dict, keyword: str) -> Optional[Dict]:
+        """Enhance content for SEO optimization"""
+        if Config.SEO_ENHANCEMENT_MODE == 'patch':
+            patch = await self._make_request_with_retry_async(
+                self._seo_patch_prompt(recipe_data, keyword), 'seo',
+                response_schema=SEO_PATCH_SCHEMA
+            )
+            if not patch:
+                return None
+            return ContentValidator().apply_patch(recipe_data, patch)
+        return await self._make_request_with_retry_async(self._seo_prompt(recipe_data, keyword), 'seo')
+
+    async def regenerate_sections(self, recipe_data: Dict, keyword: str, findings: List[Dict]) -> Optional[Dict]:
+        """Ask for just the sections the validator flagged; returns a patch for ContentValidator.apply_patch"""
+        sections = ContentValidator().sections_to_regenerate(findings)
+        if not sections:
+            return None
+        return await self._make_request_with_retry_async(
+            self._section_repair_prompt(recipe_data, keyword, findings, sections), 'section_repair',
+            response_schema=section_repair_schema(sections)
+        )
+
+    async def generate_alt_texts(self, keyword: str, image_urls: list) -> list:
+        """Generate SEO-friendly alt texts for images"""
+        prompt = self._alt_text_prompt(keyword)
+
+        try:
+            return await self._generate_cached_async(prompt, self._parse_alt_texts, 'alt_texts')
+        except Exception as e:
+            print(f"⚠️ Alt text generation failed: {e}")
+            return self._fallback_alt_texts(keyword)
+
+    async def generate_alt_texts_batch(self, keywords: List[str], fallback: bool = True) -> Dict[str, List[str]]:
+        """Alt text triples for many recipe keywords in one structured call"""
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords:
+            return {}
+        result = await self._make_request_with_retry_async(
+            self._alt_text_batch_prompt(keywords), 'alt_texts',
+            response_schema=ALT_TEXT_BATCH_SCHEMA
+        )
+        alt_texts = self._batch_items(result, keywords, 'alt_texts', self._batch_alt_texts)
+        missing = self._report_batch('alt texts', keywords, alt_texts, fallback)
+        if fallback and missing:
+            fallbacks = await asyncio.gather(*(self.generate_alt_texts(keyword, []) for keyword in missing))
+            alt_texts.update(zip(missing, fallbacks))
+        return alt_texts
+
+    async def generate_fused(self, keyword: str) -> Optional[Dict]:
+        """Generate image keyword, SEO-ready recipe and alt texts in one structured call"""
+        result = await self._make_request_with_retry_async(
+            self._fused_prompt(keyword), 'fused', response_schema=FUSED_SCHEMA
+        )
+        return self._normalize_fused(result, keyword)
+
+    def _create_model(self, model_name: str, api_key: str):
+        from google.ai import generativelanguage as glm
+
+        model = super()._create_model(model_name, api_key)
+        if api_key != self.key_pool.keys[0]:
+            # Created on first use, inside the event loop that will drive it
+            model._async_client = glm.GenerativeServiceAsyncClient(client_options={'api_key': api_key})
+        return model
+
+    async def _call_model_async(self, prompt: str, task: str, **kwargs):
+        """Single non-blocking call site for the Gemini API, guarded by the circuit breaker"""
+        self.circuit_breaker.before_call()
+        model_name = self.model_for(task)
+        stream = bool(kwargs.get('stream'))
+        lease = await self.key_pool.acquire_async(self._estimate_tokens(prompt))
+        with metrics.span('gemini.call', model=model_name, task=task, key=lease.index, stream=stream):
+            try:
+                response = await self._model(model_name, lease.key).generate_content_async(prompt, **kwargs)
+            except Exception as e:
+                self.key_pool.release(lease, error=e)
+                self.circuit_breaker.record_failure(e)
+                raise
+            self.circuit_breaker.record_success()
+            if stream:
+                self.key_pool.release(lease)
+            else:
+                self.key_pool.release(lease, actual_tokens=self._total_tokens(response))
+                metrics.record_usage(response)
+        return response
+
+    async def _generate_text_async(self, prompt: str, task: str, response_schema: Optional[Dict] = None) -> str:
+        async with self.rate_limiter.slot(self._estimate_tokens(prompt)) as usage:
+            response = await self._call_model_async(
+                prompt,
+                task,
+                generation_config=self._generation_config(response_schema)
+            )
+            total_tokens = self._total_tokens(response)
+            if total_tokens is not None:
+                usage['actual_tokens'] = total_tokens
+            return response.text
+
+    async def _generate_streamed_async(self, prompt: str, task: str) -> Dict:
+        """Async counterpart of _generate_streamed"""
+        # The cache is sqlite behind a threading.Lock, so it is kept off the event loop
+        cached = await asyncio.to_thread(self._cache_lookup, prompt, self._parse_json_response, task)
+        if cached is not None:
+            return cached
+
+        async with self.rate_limiter.slot(self._estimate_tokens(prompt)):
+            monitor = StreamMonitor(ContentValidator())
+            try:
+                response = await self._call_model_async(prompt, task, stream=True)
+                async for chunk in response:
+                    monitor.feed(chunk.text)
+                metrics.record_usage(response)
+                result = self._finish_stream(monitor)
+            except Exception:
+                self._record_stream_stats(monitor.stats(aborted=True))
+                raise
+        self._record_stream_stats(monitor.stats(aborted=False))
+        await asyncio.to_thread(self._cache_store, prompt, monitor.text, task)
+        return result
+
+    async def _generate_cached_async(self, prompt: str, parse: Callable, task: str,
+                                     response_schema: Optional[Dict] = None):
+        """Async counterpart of _generate_cached"""
+        result = await asyncio.to_thread(self._cache_lookup, prompt, parse, task)
+        if result is not None:
+            return result
+        text = await self._generate_text_async(prompt, task, response_schema)
+        result = parse(text)
+        await asyncio.to_thread(self._cache_store, prompt, text, task)
+        return result
+
+    async def _make_request_with_retry_async(self, prompt: str, task: str, response_schema: Optional[Dict] = None,
+                                             stream: bool = False) -> Optional[Dict]:
+        """Async counterpart of _make_request_with_retry"""
+        for attempt in range(Config.MAX_RETRIES):
+            metrics.set(attempts=attempt + 1)
+            try:
+                print(f"   └── Making Gemini API request (Attempt {attempt + 1}/{Config.MAX_RETRIES})...")
+                if stream:
+                    return await self._generate_streamed_async(prompt, task)
+                return await self._generate_cached_async(prompt, self._parse_json_response, task, response_schema)
+
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+        return None
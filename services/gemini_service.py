@@ -1,18 +1,299 @@
-import google.generativeai as genai
 import json
+import threading
 import time
 import re  # Thêm import re
-from typing import Dict, Optional
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
 from config.settings import Config
+from services.schemas import (
+    ALT_TEXT_BATCH_SCHEMA, FUSED_SCHEMA, IMAGE_KEYWORD_BATCH_SCHEMA, SEO_PATCH_SCHEMA, section_repair_schema
+)
+from utils.json_repair import repair_json
+from utils.json_stream import StreamMonitor
+from utils.key_pool import ApiKeyPool
+from utils.metrics import metrics
+from utils.response_cache import ResponseCache
+from utils.retry import CircuitBreaker, CircuitOpenError, backoff_delay, retry_after_hint
+from utils.validators import ContentValidator
 
 class GeminiService:
+    # Shared by every instance (and thread) so a batch stops calling a failing endpoint
+    circuit_breaker = CircuitBreaker(
+        'Gemini',
+        failure_threshold=Config.CIRCUIT_BREAKER_THRESHOLD,
+        cooldown=Config.CIRCUIT_BREAKER_COOLDOWN
+    )
+
     def __init__(self):
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        api_keys = Config.gemini_api_keys()
+        self.key_pool = ApiKeyPool(api_keys, Config.GEMINI_RPM, Config.GEMINI_TPM)
+        # Default model; GEMINI_TASK_MODELS moves individual tasks to other models
+        self.model_name = Config.GEMINI_MODEL
+        self.task_models = Config.gemini_task_models()
+        # Builds the client for a (model name, API key) pair; replaceable for tests and benchmarks
+        self.model_factory = self._create_model
+        self._models = {}
+        self._models_lock = threading.Lock()
+        # Timing of streamed generations (time to first section / to abort)
+        self.stream_stats = deque(maxlen=1000)
+        self.cache_mode = Config.GEMINI_CACHE_MODE
+        self.cache = None
+        if self.cache_mode != 'off':
+            self.cache = ResponseCache(
+                Config.GEMINI_CACHE_PATH,
+                ttl_seconds=Config.GEMINI_CACHE_TTL_HOURS * 3600,
+                max_bytes=Config.GEMINI_CACHE_MAX_MB * 1024 * 1024
+            )
     
     def extract_image_keyword(self, recipe_keyword: str) -> Optional[str]:
         """Extract optimal image search keyword from recipe keyword"""
-        prompt = f"""
+        prompt = self._image_keyword_prompt(recipe_keyword)
+        
+        try:
+            return self._generate_cached(prompt, self._clean_image_keyword, 'image_keyword')
+        except Exception as e:
+            print(f"⚠️ Image keyword extraction failed: {e}")
+            return self._fallback_image_keyword(recipe_keyword)
+
+    def extract_image_keywords_batch(self, recipe_keywords: List[str], fallback: bool = True) -> Dict[str, str]:
+        """Image search keywords for many recipe keywords in one structured call.
+
+        Keywords the response leaves out or answers badly go through
+        extract_image_keyword one at a time, or are left out if `fallback` is False.
+        """
+        recipe_keywords = list(dict.fromkeys(recipe_keywords))
+        if not recipe_keywords:
+            return {}
+        result = self._make_request_with_retry(
+            self._image_keyword_batch_prompt(recipe_keywords), 'image_keyword',
+            response_schema=IMAGE_KEYWORD_BATCH_SCHEMA
+        )
+        image_keywords = self._batch_items(result, recipe_keywords, 'image_keyword', self._batch_image_keyword)
+        missing = self._report_batch('image keywords', recipe_keywords, image_keywords, fallback)
+        if fallback:
+            for keyword in missing:
+                image_keywords[keyword] = self.extract_image_keyword(keyword)
+        return image_keywords
+    
+    def generate_recipe_content(self, keyword: str) -> Optional[Dict]:
+        """Generate complete recipe content structure"""
+        return self._make_request_with_retry(
+            self._recipe_content_prompt(keyword), 'recipe_content', stream=Config.GEMINI_STREAMING
+        )
+    
+    def enhance_content_for_seo(self, recipe_data: Dict, keyword: str) -> Optional[Dict]:
+        """Enhance content for SEO optimization"""
+        if Config.SEO_ENHANCEMENT_MODE == 'patch':
+            return self._enhance_with_patch(recipe_data, keyword)
+        return self._make_request_with_retry(self._seo_prompt(recipe_data, keyword), 'seo')
+
+    def _enhance_with_patch(self, recipe_data: Dict, keyword: str) -> Optional[Dict]:
+        """Request only the changed sections and merge them into the validated recipe"""
+        patch = self._make_request_with_retry(
+            self._seo_patch_prompt(recipe_data, keyword), 'seo',
+            response_schema=SEO_PATCH_SCHEMA
+        )
+        if not patch:
+            return None
+        return ContentValidator().apply_patch(recipe_data, patch)
+    
+    def regenerate_sections(self, recipe_data: Dict, keyword: str, findings: List[Dict]) -> Optional[Dict]:
+        """Ask for just the sections the validator flagged; returns a patch for ContentValidator.apply_patch"""
+        sections = ContentValidator().sections_to_regenerate(findings)
+        if not sections:
+            return None
+        return self._make_request_with_retry(
+            self._section_repair_prompt(recipe_data, keyword, findings, sections), 'section_repair',
+            response_schema=section_repair_schema(sections)
+        )
+    
+    def generate_alt_texts(self, keyword: str, image_urls: list) -> list:
+        """Generate SEO-friendly alt texts for images"""
+        prompt = self._alt_text_prompt(keyword)
+        
+        try:
+            return self._generate_cached(prompt, self._parse_alt_texts, 'alt_texts')
+        except Exception as e:
+            print(f"⚠️ Alt text generation failed: {e}")
+            return self._fallback_alt_texts(keyword)
+
+    def generate_alt_texts_batch(self, keywords: List[str], fallback: bool = True) -> Dict[str, List[str]]:
+        """Alt text triples for many recipe keywords in one structured call.
+
+        Keywords the response leaves out or answers badly go through
+        generate_alt_texts one at a time, or are left out if `fallback` is False.
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords:
+            return {}
+        result = self._make_request_with_retry(
+            self._alt_text_batch_prompt(keywords), 'alt_texts',
+            response_schema=ALT_TEXT_BATCH_SCHEMA
+        )
+        alt_texts = self._batch_items(result, keywords, 'alt_texts', self._batch_alt_texts)
+        missing = self._report_batch('alt texts', keywords, alt_texts, fallback)
+        if fallback:
+            for keyword in missing:
+                alt_texts[keyword] = self.generate_alt_texts(keyword, [])
+        return alt_texts
+
+    def generate_fused(self, keyword: str) -> Optional[Dict]:
+        """Generate image keyword, SEO-ready recipe and alt texts in one structured call"""
+        result = self._make_request_with_retry(self._fused_prompt(keyword), 'fused', response_schema=FUSED_SCHEMA)
+        return self._normalize_fused(result, keyword)
+
+    def model_for(self, task: str) -> str:
+        return self.task_models.get(task, self.model_name)
+
+    def _create_model(self, model_name: str, api_key: str):
+        # The SDK takes about a second to import, so it is loaded with the first model
+        import google.generativeai as genai
+        from google.ai import generativelanguage as glm
+
+        if not self._models:
+            genai.configure(api_key=self.key_pool.keys[0])
+        model = genai.GenerativeModel(model_name)
+        if api_key != self.key_pool.keys[0]:
+            # genai.configure only sets one process-wide key; other keys get their own clients
+            model._client = glm.GenerativeServiceClient(client_options={'api_key': api_key})
+        return model
+
+    def _model(self, model_name: str, api_key: str):
+        with self._models_lock:
+            model = self._models.get((model_name, api_key))
+            if model is None:
+                model = self._models[(model_name, api_key)] = self.model_factory(model_name, api_key)
+            return model
+
+    @staticmethod
+    def _estimate_tokens(prompt: str) -> int:
+        """Rough pre-request estimate (~4 characters per token) plus expected output"""
+        return len(prompt) // 4 + Config.GEMINI_OUTPUT_TOKEN_ESTIMATE
+
+    @staticmethod
+    def _total_tokens(response) -> Optional[int]:
+        usage_metadata = getattr(response, 'usage_metadata', None)
+        return getattr(usage_metadata, 'total_token_count', None)
+
+    def _call_model(self, prompt: str, task: str, **kwargs):
+        """Single blocking call site for the Gemini API, guarded by the circuit breaker.
+
+        The task picks the model; the key pool picks the least-loaded API key,
+        waiting if every key is at its per-minute quota.
+        """
+        self.circuit_breaker.before_call()
+        model_name = self.model_for(task)
+        stream = bool(kwargs.get('stream'))
+        lease = self.key_pool.acquire(self._estimate_tokens(prompt))
+        with metrics.span('gemini.call', model=model_name, task=task, key=lease.index, stream=stream):
+            try:
+                response = self._model(model_name, lease.key).generate_content(prompt, **kwargs)
+            except Exception as e:
+                self.key_pool.release(lease, error=e)
+                self.circuit_breaker.record_failure(e)
+                raise
+            self.circuit_breaker.record_success()
+            if stream:
+                # Token usage is only known once the stream is consumed; keep the estimate
+                self.key_pool.release(lease)
+            else:
+                self.key_pool.release(lease, actual_tokens=self._total_tokens(response))
+                metrics.record_usage(response)
+        return response
+
+    def _generate_text(self, prompt: str, task: str, response_schema: Optional[Dict] = None) -> str:
+        response = self._call_model(
+            prompt,
+            task,
+            generation_config=self._generation_config(response_schema)
+        )
+        return response.text
+
+    def _generate_streamed(self, prompt: str, task: str) -> Dict:
+        """Stream a JSON response, validating each section as soon as it closes.
+
+        Raises on the first broken section or on a truncated stream so the retry
+        loop can re-issue the request without waiting for the rest of the output.
+        """
+        cached = self._cache_lookup(prompt, self._parse_json_response, task)
+        if cached is not None:
+            return cached
+
+        monitor = StreamMonitor(ContentValidator())
+        try:
+            response = self._call_model(prompt, task, stream=True)
+            for chunk in response:
+                monitor.feed(chunk.text)
+            metrics.record_usage(response)
+            result = self._finish_stream(monitor)
+        except Exception:
+            self._record_stream_stats(monitor.stats(aborted=True))
+            raise
+        self._record_stream_stats(monitor.stats(aborted=False))
+        self._cache_store(prompt, monitor.text, task)
+        return result
+
+    def _finish_stream(self, monitor: StreamMonitor) -> Dict:
+        """Complete object from a stream, locally repairing truncated output"""
+        try:
+            return monitor.finish()
+        except json.JSONDecodeError:
+            return self._parse_json_response(monitor.text)
+
+    def _record_stream_stats(self, stats: Dict):
+        self.stream_stats.append(stats)
+        metrics.set(
+            stream_time_to_first_section=stats['time_to_first_section'],
+            stream_time_to_abort=stats['time_to_abort']
+        )
+        if stats['aborted']:
+            print(f"   └── Stream aborted after {stats['time_to_abort']:.1f}s ({stats['sections']} sections)")
+        elif stats['time_to_first_section'] is not None:
+            print(f"   └── First section after {stats['time_to_first_section']:.1f}s, "
+                  f"complete after {stats['duration']:.1f}s")
+
+    @staticmethod
+    def _generation_config(response_schema: Optional[Dict]) -> Optional[Dict]:
+        """JSON response mode constrained to `response_schema`, if one is given"""
+        if response_schema is None:
+            return None
+        return {
+            'response_mime_type': 'application/json',
+            'response_schema': response_schema
+        }
+
+    def _cache_lookup(self, prompt: str, parse: Callable, task: str):
+        """Return the parsed cached response, or None on miss, refresh or unparseable entry"""
+        if self.cache is None or self.cache_mode == 'refresh':
+            return None
+        cached = self.cache.get(self.model_for(task), prompt)
+        if cached is None:
+            return None
+        try:
+            result = parse(cached)
+        except Exception:
+            return None
+        metrics.add(cache_hits=1)
+        return result
+
+    def _cache_store(self, prompt: str, text: str, task: str):
+        if self.cache is not None:
+            self.cache.put(self.model_for(task), prompt, text)
+
+    def _generate_cached(self, prompt: str, parse: Callable, task: str, response_schema: Optional[Dict] = None):
+        """Serve from the response cache or call the API; only parseable responses are cached"""
+        result = self._cache_lookup(prompt, parse, task)
+        if result is not None:
+            return result
+        text = self._generate_text(prompt, task, response_schema)
+        result = parse(text)
+        self._cache_store(prompt, text, task)
+        return result
+
+    # ---- Prompts ----
+
+    def _image_keyword_prompt(self, recipe_keyword: str) -> str:
+        return f"""
         Extract the best single search term from '{recipe_keyword}' for food photography search on Pixabay.
         
         Rules:
@@ -28,18 +309,9 @@ class GeminiService:
         
         Respond with only the search term, no quotes or explanation.
         """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip().replace('"', '').replace("'", "")
-        except Exception as e:
-            print(f"⚠️ Image keyword extraction failed: {e}")
-            # Sửa lỗi: Nối 2 từ đầu tiên thành một
-            return ' '.join(recipe_keyword.split()[:2])
     
-    def generate_recipe_content(self, keyword: str) -> Optional[Dict]:
-        """Generate complete recipe content structure"""
-        prompt = f"""
+    def _recipe_content_prompt(self, keyword: str) -> str:
+        return f"""
         You are a professional recipe developer. Create a comprehensive recipe for "{keyword}".
         
         Requirements:
@@ -113,12 +385,9 @@ class GeminiService:
             ]
         }}
         """
-        
-        return self._make_request_with_retry(prompt)
     
-    def enhance_content_for_seo(self, recipe_data: Dict, keyword: str) -> Optional[Dict]:
-        """Enhance content for SEO optimization"""
-        prompt = f"""
+    def _seo_prompt(self, recipe_data: Dict, keyword: str) -> str:
+        return f"""
         Enhance the recipe content for SEO optimization with keyword "{keyword}".
         
         Current recipe: {json.dumps(recipe_data)}
@@ -134,12 +403,58 @@ class GeminiService:
         
         Return the enhanced recipe in the same JSON format.
         """
+    
+    def _seo_patch_prompt(self, recipe_data: Dict, keyword: str) -> str:
+        sections = {
+            name: recipe_data.get(name)
+            for name in ('title', 'introduction', 'variations', 'storage', 'faqs', 'tips')
+        }
+        keyword_count = ContentValidator().count_keyword_appearances(recipe_data, keyword)
+        return f"""
+        Improve these sections of a recipe for SEO with keyword "{keyword}".
+        
+        Ingredients (context only, do not return): {json.dumps(recipe_data.get('ingredients', []))}
+        Current sections: {json.dumps(sections)}
         
-        return self._make_request_with_retry(prompt)
+        SEO Requirements:
+        - The full recipe currently mentions "{keyword}" {keyword_count} times; it should appear {Config.KEYWORD_APPEARANCE_TARGET}-{Config.KEYWORD_APPEARANCE_TARGET + 1} times in total, so add {max(0, Config.KEYWORD_APPEARANCE_TARGET - keyword_count)} natural mentions in the title, introduction or sections below
+        - Expand variations to 2-3 sentences each with specific ingredients and serving suggestions
+        - Make storage instructions more comprehensive (3-4 sentences each)
+        - Ensure FAQs address common cooking concerns
+        - Make tips practical and actionable
+        - Maintain natural language flow
+        
+        Return a JSON object containing ONLY the sections you changed, each in full, using the same
+        structure as above. Omit unchanged sections.
+        """
     
-    def generate_alt_texts(self, keyword: str, image_urls: list) -> list:
-        """Generate SEO-friendly alt texts for images"""
-        prompt = f"""
+    def _section_repair_prompt(self, recipe_data: Dict, keyword: str, findings: List[Dict], sections: List[str]) -> str:
+        counts = ContentValidator().expected_counts()
+        requirements = []
+        for name in sections:
+            problems = '; '.join(f['message'] for f in findings if f['section'] == name)
+            if name in counts:
+                low, high = counts[name]
+                target = f"exactly {low}" if low == high else f"{low}-{high}"
+                requirements.append(f"- {name}: {target} items (currently: {problems})")
+            else:
+                requirements.append(f"- {name}: complete and non-empty (currently: {problems})")
+        requirements = '\n        '.join(requirements)
+        return f"""
+        Regenerate these sections of a recipe for "{keyword}".
+        
+        Recipe title: {recipe_data.get('title', keyword)}
+        Ingredients (context only): {json.dumps(recipe_data.get('ingredients', []))}
+        
+        Sections to regenerate: {', '.join(sections)}
+        {requirements}
+        
+        Return a JSON object containing ONLY these sections, each in full, using the same structure
+        as a complete recipe. Keep them consistent with the title and ingredients.
+        """
+    
+    def _alt_text_prompt(self, keyword: str) -> str:
+        return f"""
         Generate 3 SEO-friendly alt text descriptions for "{keyword}" recipe images.
         
         Images are positioned:
@@ -155,60 +470,220 @@ class GeminiService:
         
         Respond with only 3 lines, one alt text per line.
         """
+
+    def _image_keyword_batch_prompt(self, recipe_keywords: List[str]) -> str:
+        return f"""
+        Extract the best search term for each recipe keyword below, for food photography search on Pixabay.
+        
+        Rules:
+        - Return only 1-2 words maximum per keyword
+        - Focus on the main food item or cooking method
+        - Avoid overly specific terms
+        - Ensure good image results
+        
+        Examples:
+        - "grilled chicken breast" → "grilled chicken"
+        - "chocolate chip cookies" → "chocolate cookies"
+        - "beef stir fry" → "stir fry"
+        
+        Recipe keywords:
+        {self._numbered(recipe_keywords)}
+        
+        Return one item per keyword: its number as "id" and the search term, without quotes
+        or explanation, as "image_keyword".
+        """
+
+    def _alt_text_batch_prompt(self, keywords: List[str]) -> str:
+        return f"""
+        Generate 3 SEO-friendly alt text descriptions of recipe images for each recipe keyword below.
+        
+        Images are positioned:
+        1. Hero image (after recipe info)
+        2. Ingredients image (after ingredients section)
+        3. Process/final dish image (after cooking steps)
+        
+        Requirements:
+        - Include the item's keyword naturally in each of its alt texts
+        - 8-12 words per alt text
+        - Descriptive but concise
+        - SEO-optimized
+        
+        Recipe keywords:
+        {self._numbered(keywords)}
+        
+        Return one item per keyword: its number as "id" and exactly 3 alt texts, in image order,
+        as "alt_texts".
+        """
+
+    @staticmethod
+    def _numbered(keywords: List[str]) -> str:
+        return '\n        '.join(f"{index}. {keyword}" for index, keyword in enumerate(keywords, 1))
+
+    def _fused_prompt(self, keyword: str) -> str:
+        return f"""
+        You are a professional recipe developer and SEO writer. Create a comprehensive,
+        SEO-optimized recipe for "{keyword}" and the metadata needed to illustrate it.
         
+        image_keyword:
+        - The best 1-2 word search term for food photography of this dish on Pixabay
+        - Focus on the main food item or cooking method, avoid overly specific terms
+        
+        recipe:
+        - Compelling title including the keyword
+        - Realistic difficulty, timing, servings
+        - {Config.MIN_INGREDIENTS}-{Config.MAX_INGREDIENTS} ingredients with measurements
+        - {Config.MIN_STEPS}-{Config.MAX_STEPS} detailed cooking steps
+        - 2-paragraph introduction (100-120 and 80-100 words)
+        - Accurate nutrition information with % DV
+        - {Config.VARIATION_COUNT} recipe variations, 2-3 sentences each with specific ingredients and serving suggestions
+        - {Config.STORAGE_SECTIONS} storage sections, 3-4 sentences each
+        - {Config.FAQ_COUNT} practical FAQs addressing common cooking concerns
+        - {Config.TIPS_COUNT} practical, actionable professional tips
+        - Naturally integrate "{keyword}" exactly {Config.KEYWORD_APPEARANCE_TARGET}-{Config.KEYWORD_APPEARANCE_TARGET + 1} times throughout the content
+        
+        alt_texts:
+        - Exactly 3 alt texts, in order: hero image, ingredients image, process/final dish image
+        - Include "{keyword}" naturally, 8-12 words each
+        """
+
+    # ---- Response parsing and fallbacks ----
+
+    @staticmethod
+    def _clean_image_keyword(text: str) -> str:
+        return text.strip().replace('"', '').replace("'", "")
+
+    @staticmethod
+    def _fallback_image_keyword(recipe_keyword: str) -> str:
+        # Sửa lỗi: Nối 2 từ đầu tiên thành một
+        return ' '.join(recipe_keyword.split()[:2])
+
+    @staticmethod
+    def _parse_alt_texts(text: str) -> list:
+        alt_texts = [line.strip() for line in text.strip().split('\n') if line.strip()]
+        return alt_texts[:3]  # Ensure exactly 3 alt texts
+
+    @staticmethod
+    def _fallback_alt_texts(keyword: str) -> list:
+        return [
+            f"Delicious {keyword} ready to serve",
+            f"Fresh ingredients for {keyword} recipe",
+            f"Step by step {keyword} cooking process"
+        ]
+
+    @classmethod
+    def _batch_image_keyword(cls, value: Any) -> Optional[str]:
+        return cls._clean_image_keyword(value) if isinstance(value, str) else None
+
+    @staticmethod
+    def _batch_alt_texts(value: Any) -> Optional[list]:
+        if not isinstance(value, list):
+            return None
+        alt_texts = [text.strip() for text in value if isinstance(text, str) and text.strip()]
+        return alt_texts[:3] if len(alt_texts) >= 3 else None
+
+    @staticmethod
+    def _batch_items(result: Optional[Dict], keywords: List[str], field: str, parse: Callable) -> Dict[str, Any]:
+        """Map the items of a batched response back to their keywords, keeping only valid values"""
+        items = result.get('items') if isinstance(result, dict) else None
+        values = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict) or not isinstance(item.get('id'), int):
+                continue
+            index = item['id'] - 1
+            if not 0 <= index < len(keywords) or keywords[index] in values:
+                continue
+            value = parse(item.get(field))
+            if value:
+                values[keywords[index]] = value
+        return values
+
+    @staticmethod
+    def _report_batch(label: str, keywords: List[str], values: Dict, fallback: bool) -> List[str]:
+        """Print how much of a batched call came back usable; returns the keywords still missing"""
+        missing = [keyword for keyword in keywords if keyword not in values]
+        print(f"   └── Batched {label}: {len(values)}/{len(keywords)}"
+              + (f", {len(missing)} left for single calls" if missing and fallback else ""))
+        return missing
+
+    def _normalize_fused(self, result: Optional[Dict], keyword: str) -> Optional[Dict]:
+        """Fill in fallbacks for a fused response; None if the recipe itself is missing"""
+        if not isinstance(result, dict) or not isinstance(result.get('recipe'), dict):
+            return None
+        alt_texts = [text.strip() for text in result.get('alt_texts') or [] if isinstance(text, str) and text.strip()]
+        if len(alt_texts) < 3:
+            alt_texts = self._fallback_alt_texts(keyword)
+        image_keyword = self._clean_image_keyword(result.get('image_keyword') or '')
+        return {
+            'image_keyword': image_keyword or self._fallback_image_keyword(keyword),
+            'recipe': result['recipe'],
+            'alt_texts': alt_texts[:3]
+        }
+
+    @staticmethod
+    def _parse_json_response(text: str) -> Dict:
+        """Strip markdown fences and parse JSON, raising on empty or invalid output"""
+        raw_text = text.strip()
+
+        # Làm sạch nội dung nếu nó được bọc trong markdown code block
+        if raw_text.startswith('```json'):
+            raw_text = re.sub(r'^```json\s*', '', raw_text)
+            raw_text = re.sub(r'```$', '', raw_text)
+            raw_text = raw_text.strip()
+
+        # Kiểm tra nếu nội dung bị rỗng sau khi làm sạch
+        if not raw_text:
+            raise ValueError("Empty response received from API")
+
+        # Parse JSON, falling back to a local repair before paying for a re-request
         try:
-            response = self.model.generate_content(prompt)
-            alt_texts = [line.strip() for line in response.text.strip().split('\n') if line.strip()]
-            return alt_texts[:3]  # Ensure exactly 3 alt texts
-        except Exception as e:
-            print(f"⚠️ Alt text generation failed: {e}")
-            return [
-                f"Delicious {keyword} ready to serve",
-                f"Fresh ingredients for {keyword} recipe",
-                f"Step by step {keyword} cooking process"
-            ]
+            return json.loads(raw_text)
+        except json.JSONDecodeError as e:
+            try:
+                result = json.loads(repair_json(text))
+            except json.JSONDecodeError:
+                raise e
+            print("   └── 🔧 Repaired malformed JSON locally")
+            return result
 
-    def _make_request_with_retry(self, prompt: str) -> Optional[Dict]:
+    def _make_request_with_retry(self, prompt: str, task: str, response_schema: Optional[Dict] = None,
+                                 stream: bool = False) -> Optional[Dict]:
         """Make Gemini API request with robust parsing and retry logic."""
         for attempt in range(Config.MAX_RETRIES):
+            metrics.set(attempts=attempt + 1)
             try:
                 print(f"   └── Making Gemini API request (Attempt {attempt + 1}/{Config.MAX_RETRIES})...")
-                response = self.model.generate_content(prompt)
-                
-                # ---- BẮT ĐẦU PHẦN CẢI TIẾN ----
-                
-                raw_text = response.text.strip()
-
-                # Làm sạch nội dung nếu nó được bọc trong markdown code block
-                if raw_text.startswith('```json'):
-                    raw_text = re.sub(r'^```json\s*', '', raw_text)
-                    raw_text = re.sub(r'```$', '', raw_text)
-                    raw_text = raw_text.strip()
-
-                # Kiểm tra nếu nội dung bị rỗng sau khi làm sạch
-                if not raw_text:
-                    print(f"⚠️ Warning: Gemini API returned an empty response (Attempt {attempt + 1}).")
-                    raise ValueError("Empty response received from API")
-
-                # Parse JSON
-                return json.loads(raw_text)
-                
-                # ---- KẾT THÚC PHẦN CẢI TIẾN ----
-
-            except json.JSONDecodeError as e:
-                print(f"⚠️ JSON parsing error (Attempt {attempt + 1}): {e}")
-                print("   └── Gemini did not return a valid JSON. Retrying...")
-                # Không cần trả về None ngay, vòng lặp sẽ tiếp tục
-            
-            except Exception as e:
-                # Bắt các lỗi khác như ValueError từ chuỗi rỗng
-                print(f"⚠️ Gemini API error (Attempt {attempt + 1}): {e}")
+                if stream:
+                    return self._generate_streamed(prompt, task)
+                return self._generate_cached(prompt, self._parse_json_response, task, response_schema)
 
-            # Nếu không phải lần thử cuối, chờ trước khi thử lại
-            if attempt < Config.MAX_RETRIES - 1:
-                sleep_time = 2 ** (attempt + 1)
-                print(f"   └── Waiting for {sleep_time} seconds before retrying...")
-                time.sleep(sleep_time)
-        
-        print("❌ All retry attempts failed. Could not get valid data from Gemini.")
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    return None
+                time.sleep(delay)
         return None
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Report a failed attempt; seconds to wait before the next one, or None to give up.
+
+        Shared by the sync and async retry loops so both classify errors the same way.
+        """
+        if isinstance(error, CircuitOpenError):
+            print(f"⛔ {error}")
+            return None
+
+        if isinstance(error, json.JSONDecodeError):
+            print(f"⚠️ JSON parsing error (Attempt {attempt + 1}): {error}")
+            print("   └── Gemini did not return a valid JSON. Retrying...")
+            retry_after = None
+        else:
+            # Bắt các lỗi khác như ValueError từ chuỗi rỗng
+            print(f"⚠️ Gemini API error (Attempt {attempt + 1}): {error}")
+            retry_after = retry_after_hint(error)
+
+        if attempt >= Config.MAX_RETRIES - 1:
+            print("❌ All retry attempts failed. Could not get valid data from Gemini.")
+            return None
+        sleep_time = backoff_delay(attempt, retry_after)
+        print(f"   └── Waiting for {sleep_time:.1f} seconds before retrying...")
+        return sleep_time
@@ -0,0 +1,108 @@
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import Config
+from utils.file_manager import FileManager
+from utils.metrics import metrics
+from utils.response_cache import ResponseCache
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it pages keep hotlinking
+    Image = None
+
+
+class ImagePipeline:
+    """Download selected images and publish resized WebP/JPEG variants locally.
+
+    Each source image is stored once under its content hash, so the same photo
+    picked for several recipes (or re-fetched from another URL) is processed
+    once. Source URLs map to asset descriptors in a small index, so repeat runs
+    skip the download too.
+    """
+
+    def __init__(self):
+        self.asset_dir = Config.IMAGE_ASSET_DIR
+        self.url_prefix = Config.IMAGE_ASSET_URL_PREFIX
+        self.widths = sorted(int(w) for w in Config.IMAGE_WIDTHS.split(',') if w.strip())
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Source URL -> asset descriptor; entries never expire, the assets are immutable
+        self.index = ResponseCache(Config.IMAGE_INDEX_PATH, ttl_seconds=0, max_bytes=0)
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def localize(self, image_urls: List[str]) -> List[Optional[Dict]]:
+        """Asset descriptors for each URL, in order; None where an image could not be localized"""
+        os.makedirs(self.asset_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max(1, len(image_urls))) as executor:
+            return list(executor.map(self._localize_one, image_urls))
+
+    def _localize_one(self, url: str) -> Optional[Dict]:
+        cached = self.index.get('image', url)
+        if cached is not None:
+            asset = json.loads(cached)
+            if os.path.exists(os.path.join(self.asset_dir, os.path.basename(asset['url']))):
+                metrics.add(cache_hits=1)
+                return asset
+        try:
+            with metrics.span('image.download'):
+                response = self.session.get(url, timeout=Config.REQUEST_TIMEOUT)
+                response.raise_for_status()
+            asset = self._process(response.content)
+        except Exception as e:
+            print(f"⚠️ Could not localize image {url}: {e}")
+            return None
+        self.index.put('image', url, json.dumps(asset))
+        return asset
+
+    def _process(self, content: bytes) -> Dict:
+        """Write the variants for one image (unless already present) and describe them"""
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        manifest_path = os.path.join(self.asset_dir, f"{digest}.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        with Image.open(io.BytesIO(content)) as source:
+            image = source.convert('RGB')
+        widths = [w for w in self.widths if w < image.width] + [min(image.width, self.widths[-1])]
+        jpeg_set, webp_set = [], []
+        for width in sorted(set(widths)):
+            height = round(image.height * width / image.width)
+            variant = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt, ext, options, srcset in (
+                ('WEBP', 'webp', {'quality': Config.IMAGE_WEBP_QUALITY, 'method': 4}, webp_set),
+                ('JPEG', 'jpg', {'quality': Config.IMAGE_JPEG_QUALITY, 'optimize': True, 'progressive': True}, jpeg_set)
+            ):
+                buffer = io.BytesIO()
+                variant.save(buffer, fmt, **options)
+                name = f"{digest}-{width}.{ext}"
+                FileManager.write_atomic(os.path.join(self.asset_dir, name), buffer.getvalue())
+                srcset.append(f"{self.url_prefix}{name} {width}w")
+
+        largest = max(widths)
+        asset = {
+            'url': f"{self.url_prefix}{digest}-{largest}.jpg",
+            'srcset': ', '.join(jpeg_set),
+            'webp_srcset': ', '.join(webp_set),
+            'sizes': Config.IMAGE_SIZES_ATTR,
+            'width': largest,
+            'height': round(image.height * largest / image.width)
+        }
+        # Written last: its presence marks the variants above as complete
+        FileManager.write_atomic(manifest_path, json.dumps(asset))
+        return asset
@@ -1,62 +1,174 @@
+import threading
 import requests
 import time
+from requests.adapters import HTTPAdapter
 from typing import List, Optional
 from config.settings import Config
+from utils.metrics import metrics
+from utils.image_index import ImageIndex
 
 class PixabayService:
     def __init__(self):
         self.api_key = Config.PIXABAY_API_KEY
         self.base_url = "https://pixabay.com/api/"
-    
+
+        # Keep-alive connection pool shared by all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=Config.HTTP_POOL_SIZE
+        )
+        self.session.mount('https://', adapter)
+
+        # Hit lists per (query, orientation, category) with per-image usage counts;
+        # Pixabay asks for a 24h cache, after which hits are fetched again
+        self.index = ImageIndex(
+            Config.PIXABAY_INDEX_PATH,
+            ttl_seconds=Config.PIXABAY_CACHE_TTL_HOURS * 3600
+        )
+
+        # Rate limit state from the X-RateLimit-* response headers
+        self._rate_lock = threading.Lock()
+        self._remaining: Optional[int] = None
+        self._reset_at = 0.0
+
     def search_food_images(self, keyword: str) -> List[str]:
         """Search for food images and return 3 URLs"""
-        params = {
-            'key': self.api_key,
-            'q': keyword,
-            'image_type': 'photo',
-            'orientation': Config.IMAGE_ORIENTATION,
-            'category': 'food',
-            'safesearch': 'true',
-            'per_page': 10,  # Get 10 to have options
-            'order': 'popular'
-        }
-        
         try:
-            response = requests.get(
-                self.base_url, 
-                params=params, 
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            images = data.get('hits', [])
-            
-            if not images:
+            image_urls = self._search_image_urls(keyword)
+
+            if not image_urls:
                 print(f"⚠️ No images found for '{keyword}' on Pixabay")
                 return self._get_placeholder_images()
-            
+
             # Extract first 3 image URLs
-            image_urls = []
-            for img in images[:Config.IMAGES_PER_RECIPE]:
-                url = img.get(Config.IMAGE_SIZE) or img.get('webformatURL')
-                if url:
-                    image_urls.append(url)
-            
+            image_urls = image_urls[:Config.IMAGES_PER_RECIPE]
+
             # Ensure we have exactly 3 images
             while len(image_urls) < Config.IMAGES_PER_RECIPE:
                 image_urls.append(self._get_placeholder_images()[0])
-            
+
             print(f"✅ Retrieved {len(image_urls)} images for '{keyword}'")
-            return image_urls[:Config.IMAGES_PER_RECIPE]
-            
+            return image_urls
+
         except requests.exceptions.RequestException as e:
             print(f"❌ Pixabay API error: {e}")
             return self._get_placeholder_images()
         except Exception as e:
             print(f"❌ Unexpected error in image search: {e}")
             return self._get_placeholder_images()
-    
+
+    def _search_image_urls(self, keyword: str) -> List[str]:
+        """Allocate this recipe's images, searching the next result page only when the indexed hits are used up"""
+        query = ImageIndex.make_query(keyword, Config.IMAGE_ORIENTATION, 'food')
+        count = Config.IMAGES_PER_RECIPE
+
+        image_urls = self.index.allocate(query, count)
+        if len(image_urls) == count:
+            metrics.add(cache_hits=1)
+            return image_urls
+
+        error = None
+        while len(image_urls) < count:
+            page = self.index.next_page(query)
+            if not page:
+                break
+            try:
+                self._fetch_page(keyword, query, page)
+            except Exception as e:
+                # Keep the images already allocated (and counted) rather than discarding them
+                print(f"⚠️ Pixabay page {page} failed for '{keyword}': {e}")
+                error = e
+                break
+            image_urls += self.index.allocate(query, count - len(image_urls), exclude=image_urls)
+
+        if len(image_urls) < count:
+            # Every result for this query has been used (or the next page failed);
+            # fall back to the least-used images
+            image_urls += self.index.allocate(query, count - len(image_urls), allow_reuse=True, exclude=image_urls)
+        if not image_urls and error is not None:
+            raise error
+        return image_urls
+
+    def _fetch_page(self, keyword: str, query: str, page: int):
+        """Search one result page and add its hits to the index"""
+        params = {
+            'key': self.api_key,
+            'q': keyword,
+            'image_type': 'photo',
+            'orientation': Config.IMAGE_ORIENTATION,
+            'category': 'food',
+            'safesearch': 'true',
+            'per_page': Config.PIXABAY_PER_PAGE,
+            'order': 'popular',
+            'page': page
+        }
+
+        response = self._get(params)
+        response.raise_for_status()
+        data = response.json()
+
+        hits = []
+        for img in data.get('hits', []):
+            url = img.get(Config.IMAGE_SIZE) or img.get('webformatURL')
+            if url:
+                hits.append({'id': img['id'], 'url': url})
+
+        # Pixabay rejects pages past totalHits, so stop at the last full page
+        exhausted = (len(data.get('hits', [])) < Config.PIXABAY_PER_PAGE
+                     or page * Config.PIXABAY_PER_PAGE >= data.get('totalHits', 0))
+        self.index.add_page(query, page, hits, exhausted)
+
+    def _get(self, params: dict) -> requests.Response:
+        """GET with pacing from rate-limit headers and one retry after a 429"""
+        for attempt in range(2):
+            self._wait_for_quota()
+            with metrics.span('pixabay.request') as span:
+                response = self.session.get(
+                    self.base_url,
+                    params=params,
+                    timeout=Config.REQUEST_TIMEOUT
+                )
+                span.attrs['status_code'] = response.status_code
+            self._update_quota(response)
+            if response.status_code != 429 or attempt == 1:
+                return response
+            print("⚠️ Pixabay rate limit reached, waiting for reset...")
+            retry_after = float(response.headers.get('Retry-After', 1))
+            with self._rate_lock:
+                self._remaining = 0
+                self._reset_at = max(self._reset_at, time.monotonic() + retry_after)
+        return response
+
+    def _wait_for_quota(self):
+        """Sleep until the window resets when the remaining quota is nearly spent"""
+        with self._rate_lock:
+            now = time.monotonic()
+            if self._remaining is not None and now >= self._reset_at:
+                # Assume a fresh window once the reset has passed
+                self._remaining = None
+            if self._remaining is None or self._remaining > Config.PIXABAY_RATE_LIMIT_RESERVE:
+                if self._remaining is not None:
+                    self._remaining -= 1
+                return
+            # Left low until the reset, so every concurrent caller waits for it
+            delay = self._reset_at - now
+        if delay > 0:
+            print(f"   └── Pixabay quota low, pausing {delay:.1f}s...")
+            time.sleep(delay)
+
+    def _update_quota(self, response: requests.Response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None:
+            return
+        with self._rate_lock:
+            try:
+                self._remaining = int(remaining)
+                self._reset_at = time.monotonic() + float(reset or 60)
+            except ValueError:
+                self._remaining = None
+
     def _get_placeholder_images(self) -> List[str]:
         """Return placeholder image URLs when search fails"""
         return [
@@ -0,0 +1,142 @@
+"""Response schemas for Gemini structured (JSON mode) output."""
+
+TITLED_TEXT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'content': {'type': 'string'}
+    },
+    'required': ['title', 'content']
+}
+
+RECIPE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'rating': {'type': 'number'},
+        'review_count': {'type': 'integer'},
+        'difficulty': {'type': 'string', 'enum': ['Easy', 'Medium', 'Hard']},
+        'prep_time': {'type': 'integer'},
+        'cook_time': {'type': 'integer'},
+        'total_time': {'type': 'integer'},
+        'servings': {'type': 'integer'},
+        'introduction': {
+            'type': 'object',
+            'properties': {
+                'paragraph1': {'type': 'string'},
+                'paragraph2': {'type': 'string'}
+            },
+            'required': ['paragraph1', 'paragraph2']
+        },
+        'ingredients': {'type': 'array', 'items': {'type': 'string'}},
+        'instructions': {'type': 'array', 'items': {'type': 'string'}},
+        'nutrition': {
+            'type': 'object',
+            'properties': {
+                'calories': {'type': 'integer'},
+                'total_fat': {'type': 'string'},
+                'saturated_fat': {'type': 'string'},
+                'cholesterol': {'type': 'string'},
+                'sodium': {'type': 'string'},
+                'total_carbs': {'type': 'string'},
+                'fiber': {'type': 'string'},
+                'sugars': {'type': 'string'},
+                'protein': {'type': 'string'}
+            }
+        },
+        'variations': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'title': {'type': 'string'},
+                    'description': {'type': 'string'}
+                },
+                'required': ['title', 'description']
+            }
+        },
+        'storage': {'type': 'array', 'items': TITLED_TEXT_SCHEMA},
+        'faqs': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'question': {'type': 'string'},
+                    'answer': {'type': 'string'}
+                },
+                'required': ['question', 'answer']
+            }
+        },
+        'tips': {'type': 'array', 'items': TITLED_TEXT_SCHEMA}
+    },
+    'required': [
+        'title', 'rating', 'review_count', 'difficulty', 'prep_time', 'cook_time',
+        'total_time', 'servings', 'introduction', 'ingredients', 'instructions',
+        'nutrition', 'variations', 'storage', 'faqs', 'tips'
+    ]
+}
+
+FUSED_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'image_keyword': {'type': 'string'},
+        'recipe': RECIPE_SCHEMA,
+        'alt_texts': {'type': 'array', 'items': {'type': 'string'}}
+    },
+    'required': ['image_keyword', 'recipe', 'alt_texts']
+}
+
+# Batched image keyword / alt text calls: one item per numbered keyword in the prompt
+IMAGE_KEYWORD_BATCH_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'items': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'integer'},
+                    'image_keyword': {'type': 'string'}
+                },
+                'required': ['id', 'image_keyword']
+            }
+        }
+    },
+    'required': ['items']
+}
+
+ALT_TEXT_BATCH_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'items': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'integer'},
+                    'alt_texts': {'type': 'array', 'items': {'type': 'string'}}
+                },
+                'required': ['id', 'alt_texts']
+            }
+        }
+    },
+    'required': ['items']
+}
+
+# Sections the patch-mode SEO enhancement may rewrite; every field is optional
+SEO_PATCH_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        name: RECIPE_SCHEMA['properties'][name]
+        for name in ('title', 'introduction', 'variations', 'storage', 'faqs', 'tips')
+    }
+}
+
+
+def section_repair_schema(sections) -> dict:
+    """Schema for a targeted regeneration of just the given recipe sections"""
+    return {
+        'type': 'object',
+        'properties': {name: RECIPE_SCHEMA['properties'][name] for name in sections},
+        'required': list(sections)
+    }
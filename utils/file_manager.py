@@ -1,22 +1,176 @@
 import os
 import re
+import gzip
+import json
+import filecmp
+import hashlib
+import tempfile
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from config.settings import Config
+from utils.job_store import JobStore
+from utils.manifest import MANIFEST_NAME, Manifest
+
+# Buffer for streamed writes; rendered pages arrive as many small chunks
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output identical for identical pages
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    import brotli
+    return brotli.compress(data, quality=11)
+
+
+# Precompressed sibling formats: extension -> compressor
+COMPRESSORS = {'gz': _gzip, 'br': _brotli}
+
+
+def compression_formats(setting: str = None) -> List[str]:
+    """Formats from OUTPUT_PRECOMPRESS that can actually be produced here"""
+    formats = []
+    for fmt in (setting if setting is not None else Config.OUTPUT_PRECOMPRESS).split(','):
+        fmt = fmt.strip().lower()
+        if fmt not in COMPRESSORS or fmt in formats:
+            continue
+        if fmt == 'br':
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                print("⚠️ OUTPUT_PRECOMPRESS includes 'br' but brotli is not installed; skipping .br files")
+                continue
+        formats.append(fmt)
+    return formats
+
 
 class FileManager:
-    def save_recipe(self, html_content: str, keyword: str) -> str:
-        """Save recipe HTML to file"""
+    """Publishes recipe pages into a hash-sharded output tree.
+
+    Pages live in OUTPUT_DIR/<shard>/<name>.html, where the shard comes from a hash
+    of the normalised keyword, so no directory grows past a few hundred entries.
+    Every file is written to a temp file and renamed into place. Pages can get
+    precompressed .gz/.br siblings, and each publish is recorded in the manifest.
+    """
+
+    def __init__(self, output_dir: str = None):
+        self.output_dir = output_dir or Config.OUTPUT_DIR
+        self.formats = compression_formats()
+        self.manifest = Manifest(os.path.join(self.output_dir, MANIFEST_NAME))
+
+    def recipe_path(self, keyword: str) -> str:
+        """Where a new page for the keyword is published"""
         # Create safe filename
         safe_keyword = re.sub(r'[^a-zA-Z0-9\s]', '', keyword)
         safe_keyword = re.sub(r'\s+', '_', safe_keyword.strip())
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{safe_keyword.lower()}_{timestamp}.html"
-        
-        # Full file path
-        filepath = os.path.join(Config.OUTPUT_DIR, filename)
-        
+
+        digest = hashlib.sha1(JobStore.make_key(keyword).encode('utf-8')).hexdigest()
+        shards = [digest[2 * level:2 * level + 2] for level in range(Config.OUTPUT_SHARD_LEVELS)]
+        return os.path.join(self.output_dir, *shards, filename)
+
+    def save_recipe(self, html_content: Union[str, Iterable[str]], keyword: str, data: Optional[Dict] = None,
+                    filepath: Optional[str] = None) -> str:
+        """Save recipe HTML (a string or streamed chunks) to file, plus its template data as a JSON sidecar"""
+        filepath = filepath or self.recipe_path(keyword)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
         # Write file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
+        self.write_atomic(filepath, html_content)
+
+        if data is not None:
+            self.save_recipe_data(filepath, data)
+
+        sha256, size, compressed = self.precompress(filepath, self.formats)
+        self.manifest.append(keyword, filepath, sha256, size, compressed)
         return filepath
+
+    @staticmethod
+    def relative_root(html_path: str, output_dir: str = None) -> str:
+        """Prefix that leads from a page back to the output root ('' for top-level pages)"""
+        relative = os.path.relpath(os.path.dirname(os.path.abspath(html_path)),
+                                   os.path.abspath(output_dir or Config.OUTPUT_DIR))
+        if relative == os.curdir:
+            return ''
+        return '../' * len(relative.split(os.sep))
+
+    @staticmethod
+    def precompress(path: str, formats: List[str], force: bool = True) -> Tuple[str, int, List[str]]:
+        """Write `<path>.<fmt>` siblings for each format; returns (sha256, size, formats written).
+
+        Without `force`, siblings that already exist are left alone.
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        for fmt in formats:
+            sibling = f"{path}.{fmt}"
+            if force or not os.path.exists(sibling):
+                FileManager.write_atomic(sibling, COMPRESSORS[fmt](content))
+        return hashlib.sha256(content).hexdigest(), len(content), list(formats)
+
+    @staticmethod
+    def data_path(html_path: str) -> str:
+        """Path of the JSON sidecar stored next to a recipe HTML file"""
+        return os.path.splitext(html_path)[0] + '.json'
+
+    def save_recipe_data(self, html_path: str, data: Dict):
+        """Store validated recipe data and image metadata so the page can be re-rendered offline"""
+        self.write_atomic(self.data_path(html_path), json.dumps(data, ensure_ascii=False, indent=2))
+
+    @staticmethod
+    def write_atomic(path: str, content: Union[str, bytes, Iterable[str]], only_if_changed: bool = False) -> bool:
+        """Stream content into a temp file beside `path`, then rename it into place.
+
+        Readers never see a half-written file, and a failed render leaves the old
+        file untouched. With `only_if_changed`, an identical result is discarded
+        and the existing file (and its mtime) is kept. Returns True if written.
+        """
+        directory = os.path.dirname(path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            if isinstance(content, bytes):
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+            else:
+                with os.fdopen(fd, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+                    if isinstance(content, str):
+                        f.write(content)
+                    else:
+                        f.writelines(content)
+            if only_if_changed and os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+                os.remove(tmp_path)
+                return False
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+            return True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def load_recipe_data(data_path: str) -> Dict:
+        with open(data_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def list_recipe_data(output_dir: str = None) -> List[str]:
+        """JSON sidecars of every published page, from the manifest plus legacy top-level pages.
+
+        Includes pages superseded by a later generation of the same keyword, as
+        long as they are still on disk, since they stay published and linked.
+        """
+        output_dir = output_dir or Config.OUTPUT_DIR
+        if not os.path.isdir(output_dir):
+            return []
+        manifest = Manifest(os.path.join(output_dir, MANIFEST_NAME))
+        paths = {FileManager.data_path(manifest.full_path(entry)) for entry in manifest.all_entries()}
+        # Pages published before sharding sit directly in the output directory
+        paths.update(
+            os.path.join(output_dir, name) for name in os.listdir(output_dir)
+            if name.endswith('.json')
+        )
+        return sorted(path for path in paths if os.path.exists(path))
@@ -0,0 +1,190 @@
+import atexit
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: flushes are still serialised within a process
+    fcntl = None
+
+from config.settings import Config
+
+LOG_NAME = 'generation_log.jsonl'
+
+# Rotated segments: generation_log.<YYYYmmdd_HHMMSS>[_n].jsonl[.gz], named by rotation time
+_SEGMENT_RE = re.compile(r'^generation_log\.(\d{8}_\d{6})(?:_\d+)?\.jsonl(?:\.gz)?$')
+
+
+class GenerationLog:
+    """Buffered, rotating JSON Lines log with one record per generation.
+
+    Records are buffered in memory and written every GENERATION_LOG_FLUSH_LINES
+    records, GENERATION_LOG_FLUSH_SECONDS after the first unwritten one, and at
+    exit. A flush holds an exclusive lock on `<log>.lock` and appends the whole
+    buffer in one write, so batch threads, the HTTP service and other processes
+    never interleave lines. Once the active file reaches GENERATION_LOG_MAX_MB,
+    or its first record is older than GENERATION_LOG_MAX_AGE_HOURS, it is
+    renamed to a timestamped segment and gzipped. `read` streams every segment,
+    oldest first, so no reader needs the whole log in memory.
+    """
+
+    def __init__(self, log_dir: str = None, max_bytes: int = None, max_age: float = None,
+                 flush_lines: int = None, flush_seconds: float = None):
+        self.log_dir = log_dir or Config.LOG_DIR
+        self.path = os.path.join(self.log_dir, LOG_NAME)
+        self.max_bytes = int(Config.GENERATION_LOG_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.max_age = Config.GENERATION_LOG_MAX_AGE_HOURS * 3600 if max_age is None else max_age
+        self.flush_lines = max(1, flush_lines or Config.GENERATION_LOG_FLUSH_LINES)
+        self.flush_seconds = Config.GENERATION_LOG_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.flush_lines
+            if not full and self._timer is None and self.flush_seconds > 0:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records, rotating the active file first if it is due"""
+        segment = None
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            data = ''.join(lines).encode('utf-8')
+            try:
+                os.makedirs(self.log_dir, exist_ok=True)
+                with self._file_lock():
+                    segment = self._rotate_if_due()
+                    fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                    try:
+                        while data:
+                            data = data[os.write(fd, data):]
+                    finally:
+                        os.close(fd)
+            except OSError as e:
+                print(f"⚠️ Could not write to log file: {e}")
+        # The renamed segment is no longer written to, so gzip runs without holding either lock
+        if segment:
+            try:
+                self._compress(segment)
+            except OSError as e:
+                print(f"⚠️ Could not compress {os.path.basename(segment)}: {e}")
+
+    @staticmethod
+    def segments(log_dir: str = None) -> List[str]:
+        """Rotated segments oldest first, then the active file"""
+        log_dir = log_dir or Config.LOG_DIR
+        if not os.path.isdir(log_dir):
+            return []
+        names = set(os.listdir(log_dir))
+        paths = [
+            os.path.join(log_dir, name) for name in sorted(names)
+            # A plain segment whose .gz is already in place is about to be removed
+            if _SEGMENT_RE.match(name) and name + '.gz' not in names
+        ]
+        active = os.path.join(log_dir, LOG_NAME)
+        if os.path.exists(active):
+            paths.append(active)
+        return paths
+
+    @classmethod
+    def read(cls, log_dir: str = None, since: Optional[datetime] = None) -> Iterator[Dict]:
+        """Stream records from every segment, skipping segments rotated before `since`.
+
+        Records inside a segment are not filtered; compare their timestamps as needed.
+        """
+        for path in cls.segments(log_dir):
+            match = _SEGMENT_RE.match(os.path.basename(path))
+            if since and match and datetime.strptime(match.group(1), '%Y%m%d_%H%M%S') <= since:
+                continue
+            try:
+                yield from cls._read_segment(path)
+            except FileNotFoundError:
+                # Compressed (or rotated) by a writer since it was listed
+                if os.path.exists(path + '.gz'):
+                    yield from cls._read_segment(path + '.gz')
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Dict]:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _rotate_if_due(self) -> Optional[str]:
+        """Rename the active file to a new segment if it is too big or too old; returns the segment"""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return None
+        if not size:
+            return None
+        due = bool(self.max_bytes) and size >= self.max_bytes
+        if not due and self.max_age:
+            started = self._first_timestamp()
+            due = started is not None and (datetime.now() - started).total_seconds() >= self.max_age
+        if not due:
+            return None
+
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        segment = os.path.join(self.log_dir, f"generation_log.{stamp}.jsonl")
+        suffix = 1
+        while os.path.exists(segment) or os.path.exists(segment + '.gz'):
+            segment = os.path.join(self.log_dir, f"generation_log.{stamp}_{suffix:03d}.jsonl")
+            suffix += 1
+        os.replace(self.path, segment)
+        print(f"🗂️ Rotated generation log to {os.path.basename(segment)}.gz")
+        return segment
+
+    def _first_timestamp(self) -> Optional[datetime]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            line = f.readline()
+        try:
+            return datetime.fromisoformat(json.loads(line)['timestamp'])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _compress(segment: str):
+        tmp_path = segment + '.gz.tmp'
+        with open(segment, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, segment + '.gz')
+        os.remove(segment)
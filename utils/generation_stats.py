@@ -0,0 +1,176 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+# Distinct values kept per distribution; the rest are counted under 'other'
+MAX_CATEGORIES = 50
+
+# Per-recipe count field -> report label
+SECTION_FIELDS = {
+    'ingredients_count': 'Ingredients',
+    'steps_count': 'Steps',
+    'faqs_count': 'FAQs',
+    'tips_count': 'Tips',
+    'images_retrieved': 'Images'
+}
+
+
+class RunningSummary:
+    """Count, mean, min and max of a numeric series without keeping the values"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'min': self.min,
+            'max': self.max
+        }
+
+
+class GenerationStats:
+    """Aggregates over generation log records, fed one record at a time.
+
+    Memory stays constant however long the log is: numeric fields keep running
+    summaries and distributions keep at most MAX_CATEGORIES distinct values.
+    """
+
+    def __init__(self, since: Optional[datetime] = None):
+        self.since = since
+        self.records = 0
+        self.succeeded = 0
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+        self.rating = RunningSummary()
+        self.duration = RunningSummary()
+        self.sections = {name: RunningSummary() for name in SECTION_FIELDS}
+        self.ratings = Counter()
+        self.difficulty = Counter()
+        self.section_counts = {name: Counter() for name in SECTION_FIELDS}
+        self.errors = Counter()
+        self.gemini = Counter()
+
+    def add_all(self, records: Iterable[Dict]) -> 'GenerationStats':
+        for record in records:
+            self.add(record)
+        return self
+
+    def add(self, record: Dict):
+        timestamp = record.get('timestamp')
+        if self.since is not None:
+            try:
+                if datetime.fromisoformat(timestamp) <= self.since:
+                    return
+            except (TypeError, ValueError):
+                return
+        self.records += 1
+        if isinstance(timestamp, str):
+            self.first = min(self.first or timestamp, timestamp)
+            self.last = max(self.last or timestamp, timestamp)
+
+        # Records written before failures were logged are all successes
+        if record.get('success') is False:
+            self._count(self.errors, record.get('error') or 'unknown')
+            return
+        self.succeeded += 1
+
+        rating = record.get('rating')
+        if isinstance(rating, (int, float)):
+            self.rating.add(rating)
+            self._count(self.ratings, round(rating * 2) / 2)
+        if record.get('difficulty'):
+            self._count(self.difficulty, str(record['difficulty']).strip().title())
+        for name in SECTION_FIELDS:
+            value = record.get(name)
+            if isinstance(value, int):
+                self.sections[name].add(value)
+                self._count(self.section_counts[name], value)
+        if isinstance(record.get('duration_ms'), (int, float)):
+            self.duration.add(record['duration_ms'] / 1000)
+        for key, value in (record.get('gemini') or {}).items():
+            if isinstance(value, (int, float)):
+                self.gemini[key] += value
+
+    @staticmethod
+    def _count(counter: Counter, value):
+        if value in counter or len(counter) < MAX_CATEGORIES:
+            counter[value] += 1
+        else:
+            counter['other'] += 1
+
+    @property
+    def failed(self) -> int:
+        return self.records - self.succeeded
+
+    def to_dict(self) -> Dict:
+        return {
+            'records': self.records,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'success_rate': round(self.succeeded / self.records, 4) if self.records else None,
+            'first': self.first,
+            'last': self.last,
+            'rating': dict(self.rating.to_dict(), distribution=self._sorted(self.ratings)),
+            'difficulty': dict(self.difficulty.most_common()),
+            'sections': {
+                name: dict(self.sections[name].to_dict(), distribution=self._sorted(self.section_counts[name]))
+                for name in SECTION_FIELDS
+            },
+            'duration_seconds': self.duration.to_dict(),
+            'gemini': dict(self.gemini),
+            'errors': dict(self.errors.most_common())
+        }
+
+    @staticmethod
+    def _sorted(counter: Counter) -> Dict:
+        """Numeric buckets in order, with 'other' last"""
+        keys = sorted(key for key in counter if key != 'other')
+        if 'other' in counter:
+            keys.append('other')
+        return {str(key): counter[key] for key in keys}
+
+    def print_report(self):
+        if not self.records:
+            print("📊 No generations logged" + (f" since {self.since.isoformat()}" if self.since else ""))
+            return
+        rate = self.succeeded / self.records * 100
+        rating = self.rating.to_dict()
+        duration = self.duration.to_dict()
+        print(f"📊 Generation Stats ({self.first[:10] if self.first else '?'} → {self.last[:10] if self.last else '?'})")
+        print(f"   ├── Generations: {self.records} ({self.succeeded} succeeded, {self.failed} failed, {rate:.1f}% success)")
+        if rating['count']:
+            print(f"   ├── Rating: {rating['mean']:.2f} avg ({rating['min']}-{rating['max']})")
+            print(f"   │   └── {self._format(self._sorted(self.ratings))}")
+        if self.difficulty:
+            print(f"   ├── Difficulty: {', '.join(f'{k} {v}' for k, v in self.difficulty.most_common())}")
+        for name, label in SECTION_FIELDS.items():
+            summary = self.sections[name].to_dict()
+            if summary['count']:
+                print(f"   ├── {label}: {summary['mean']:.1f} avg ({summary['min']}-{summary['max']}) "
+                      f"| {self._format(self._sorted(self.section_counts[name]))}")
+        if duration['count']:
+            print(f"   ├── Duration: {duration['mean']:.1f}s avg, {duration['max']:.1f}s max")
+        if self.gemini:
+            print(f"   ├── Gemini: {self.gemini.get('calls', 0)} calls, {self.gemini.get('prompt_tokens', 0)} prompt + "
+                  f"{self.gemini.get('response_tokens', 0)} response tokens")
+        if not self.errors:
+            print("   └── Errors: none")
+            return
+        print("   └── Top errors:")
+        for error, count in self.errors.most_common(5):
+            print(f"       {count:>5} × {error[:100]}")
+
+    @staticmethod
+    def _format(distribution: Dict) -> str:
+        return ' '.join(f"{key}×{count}" for key, count in distribution.items())
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+
+class ImageIndex:
+    """Persistent image keyword -> Pixabay hit list, with a usage counter per image.
+
+    Hit lists are kept per query and grown one result page at a time. Images are
+    handed out least-used first, so recipes sharing an image keyword get different
+    photos and a new search is only needed once every known hit has been used.
+    Hit URLs expire on Pixabay's side, so a query's hits are dropped after
+    `ttl_seconds` and fetched again. Usage counters are keyed by image id and
+    survive the refresh.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; allocation runs in an explicit IMMEDIATE transaction so
+        # concurrent processes never hand out the same unused image twice
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                next_page INTEGER NOT NULL,
+                exhausted INTEGER NOT NULL DEFAULT 0,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS hits (
+                query TEXT NOT NULL,
+                image_id INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (query, image_id)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS usage (
+                image_id INTEGER PRIMARY KEY,
+                uses INTEGER NOT NULL,
+                last_used_at REAL NOT NULL
+            )"""
+        )
+
+    @staticmethod
+    def make_query(keyword: str, orientation: str, category: str) -> str:
+        return f"{' '.join(keyword.lower().split())}|{orientation}|{category}"
+
+    def next_page(self, query: str) -> int:
+        """Page to request next for a query, or 0 once every result page is indexed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_page, exhausted, fetched_at FROM queries WHERE query = ?", (query,)
+            ).fetchone()
+            if row is None or self._expired(row[2]):
+                return 1
+            return 0 if row[1] else row[0]
+
+    def add_page(self, query: str, page: int, hits: List[Dict], exhausted: bool):
+        """Index one page of results; page 1 replaces any expired hit list"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if page == 1:
+                    self._conn.execute("DELETE FROM hits WHERE query = ?", (query,))
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO queries (query, next_page, exhausted, fetched_at) VALUES (?, ?, ?, ?)",
+                        (query, 2, int(exhausted), now)
+                    )
+                else:
+                    self._conn.execute(
+                        "UPDATE queries SET next_page = ?, exhausted = ? WHERE query = ?",
+                        (page + 1, int(exhausted), query)
+                    )
+                offset = self._conn.execute(
+                    "SELECT COUNT(*) FROM hits WHERE query = ?", (query,)
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO hits (query, image_id, url, position) VALUES (?, ?, ?, ?)",
+                    [(query, hit['id'], hit['url'], offset + i) for i, hit in enumerate(hits)]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def allocate(self, query: str, count: int, allow_reuse: bool = False, exclude: List[str] = ()) -> List[str]:
+        """Claim up to `count` images for a recipe and count their use.
+
+        Only never-used images are returned unless `allow_reuse` is set, in which
+        case the least-used images fill the remaining slots. URLs in `exclude`
+        (already picked for the same recipe) are never returned.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT fetched_at FROM queries WHERE query = ?", (query,)).fetchone()
+                if row is None or self._expired(row[0]):
+                    self._conn.execute("COMMIT")
+                    return []
+                placeholders = ','.join('?' * len(exclude))
+                rows = self._conn.execute(
+                    f"""SELECT hits.image_id, hits.url FROM hits
+                        LEFT JOIN usage ON usage.image_id = hits.image_id
+                        WHERE hits.query = ? AND (? OR COALESCE(usage.uses, 0) = 0)
+                          AND hits.url NOT IN ({placeholders})
+                        ORDER BY COALESCE(usage.uses, 0), hits.position
+                        LIMIT ?""",
+                    (query, int(allow_reuse), *exclude, count)
+                ).fetchall()
+                self._conn.executemany(
+                    "INSERT INTO usage (image_id, uses, last_used_at) VALUES (?, 1, ?) "
+                    "ON CONFLICT(image_id) DO UPDATE SET uses = uses + 1, last_used_at = excluded.last_used_at",
+                    [(image_id, now) for image_id, _ in rows]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [url for _, url in rows]
+
+    def _expired(self, fetched_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - fetched_at > self.ttl_seconds
@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class JobStore:
+    """Durable per-keyword job state and phase checkpoints.
+
+    Every keyword is a job identified by its normalised form, so the same recipe
+    is never generated twice across runs. While a job runs, the output of each
+    paid phase is saved as a checkpoint; a job interrupted by a crash, Ctrl-C or
+    a failed later phase resumes from those checkpoints instead of starting over.
+    Checkpoints are dropped once the job is done.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                status TEXT NOT NULL,
+                filename TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS checkpoints (
+                key TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (key, phase)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(keyword: str) -> str:
+        return ' '.join(keyword.lower().split())
+
+    def enqueue(self, keywords: Iterable[str], force: bool = False) -> Tuple[List[str], List[str]]:
+        """Register keywords as jobs; returns (to_run, already_done).
+
+        Keywords that are already done are skipped unless `force` is set, in which
+        case they are reset to pending and generated again.
+        """
+        to_run, done = [], []
+        now = time.time()
+        with self._lock:
+            for keyword in keywords:
+                key = self.make_key(keyword)
+                row = self._conn.execute("SELECT status FROM jobs WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO jobs (key, keyword, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, keyword, STATUS_PENDING, now, now)
+                    )
+                elif row[0] == STATUS_DONE and not force:
+                    done.append(keyword)
+                    continue
+                elif row[0] == STATUS_DONE:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, filename = NULL, error = NULL, updated_at = ? WHERE key = ?",
+                        (STATUS_PENDING, now, key)
+                    )
+                to_run.append(keyword)
+            self._conn.commit()
+        return to_run, done
+
+    def finished_file(self, keyword: str) -> Optional[str]:
+        """Output file of the keyword's job if it is done"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename FROM jobs WHERE key = ? AND status = ?", (self.make_key(keyword), STATUS_DONE)
+            ).fetchone()
+        return row[0] if row else None
+
+    def unfinished(self) -> List[str]:
+        """Keywords of every job that is pending, was interrupted or failed, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT keyword FROM jobs WHERE status != ? ORDER BY created_at, rowid", (STATUS_DONE,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def start(self, keyword: str):
+        self._set_status(keyword, STATUS_RUNNING, attempt=True)
+
+    def complete(self, keyword: str, filename: str):
+        key = self.make_key(keyword)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, filename = ?, error = NULL, updated_at = ? WHERE key = ?",
+                (STATUS_DONE, filename, time.time(), key)
+            )
+            self._conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def fail(self, keyword: str, error: str):
+        self._set_status(keyword, STATUS_FAILED, error=error)
+
+    def _set_status(self, keyword: str, status: str, error: Optional[str] = None, attempt: bool = False):
+        key = self.make_key(keyword)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (key, keyword, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, keyword, status, now, now)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, attempts = attempts + ?, updated_at = ? WHERE key = ?",
+                (status, error, 1 if attempt else 0, now, key)
+            )
+            self._conn.commit()
+
+    def load_checkpoint(self, keyword: str, phase: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM checkpoints WHERE key = ? AND phase = ?", (self.make_key(keyword), phase)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_checkpoint(self, keyword: str, phase: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, phase, value, created_at) VALUES (?, ?, ?, ?)",
+                (self.make_key(keyword), phase, json.dumps(value), time.time())
+            )
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
@@ -0,0 +1,106 @@
+import json
+import re
+from typing import List
+
+_FENCE_RE = re.compile(r'```(?:json)?', re.IGNORECASE)
+_LITERAL_TAIL_RE = re.compile(r'[A-Za-z0-9.+\-]+$')
+_STRING_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+
+def repair_json(text: str) -> str:
+    """Best-effort repair of malformed model output into parseable JSON text.
+
+    Handles markdown fences (including unterminated ones), prose before or after
+    the JSON value, trailing commas, raw control characters inside strings and
+    output truncated mid-string, mid-key or mid-value (open containers are closed).
+    """
+    text = _FENCE_RE.sub('', text)
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        return text.strip()
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    expecting_key = False
+    key_start = None  # position in `out` of an object key whose ':' has not arrived yet
+
+    for ch in text[min(starts):]:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            elif ch in _STRING_ESCAPES:
+                ch = _STRING_ESCAPES[ch]
+            out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+            if stack and stack[-1] == '{' and expecting_key:
+                key_start = len(out)
+            out.append(ch)
+        elif ch in '{[':
+            stack.append(ch)
+            expecting_key = ch == '{'
+            key_start = None
+            out.append(ch)
+        elif ch in '}]':
+            if not stack:
+                break
+            _strip_trailing_comma(out)
+            out.append('}' if stack.pop() == '{' else ']')
+            expecting_key = False
+            key_start = None
+            if not stack:
+                break  # root value closed; ignore any trailing prose
+        elif ch == ',':
+            expecting_key = bool(stack) and stack[-1] == '{'
+            key_start = None
+            out.append(ch)
+        elif ch == ':':
+            expecting_key = False
+            key_start = None
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    if not stack:
+        return ''.join(out)
+
+    # Truncated output: close the open string, drop incomplete tokens, close containers
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    if key_start is not None:
+        del out[key_start:]
+
+    repaired = ''.join(out).rstrip()
+    tail = _LITERAL_TAIL_RE.search(repaired)
+    if tail and not _is_literal(tail.group()):
+        repaired = repaired[:tail.start()].rstrip()
+    if repaired.endswith(':'):
+        repaired += ' null'
+    repaired = repaired.rstrip(',').rstrip()
+
+    return repaired + ''.join('}' if opener == '{' else ']' for opener in reversed(stack))
+
+
+def _strip_trailing_comma(out: List[str]):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ',':
+        del out[i]
+
+
+def _is_literal(token: str) -> bool:
+    try:
+        json.loads(token)
+        return True
+    except ValueError:
+        return False
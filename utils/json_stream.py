@@ -0,0 +1,115 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.json_repair import repair_json
+
+
+class IncrementalJSONParser:
+    """Parse a streamed JSON object one top-level member at a time.
+
+    Chunks are fed as they arrive; `feed` returns every (key, value) pair whose
+    value closed inside the new data. Leading prose or a ```json fence before the
+    opening brace is skipped. A member that does not parse even after local
+    repair raises json.JSONDecodeError immediately instead of at the end of
+    the stream.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.closed = False
+        self.member_start = 0
+        self.members: Dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.buffer += chunk
+        completed = []
+        while self.pos < len(self.buffer) and not self.closed:
+            ch = self.buffer[self.pos]
+            if not self.started:
+                if ch == '{':
+                    self.started = True
+                    self.depth = 1
+                    self.member_start = self.pos + 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    completed.extend(self._complete_member(self.pos))
+                    self.closed = True
+            elif ch == ',' and self.depth == 1:
+                completed.extend(self._complete_member(self.pos))
+            self.pos += 1
+        return completed
+
+    def _complete_member(self, end: int) -> List[Tuple[str, Any]]:
+        member = self.buffer[self.member_start:end].strip()
+        self.member_start = end + 1
+        if not member:
+            return []
+        try:
+            parsed = json.loads('{' + member + '}')
+        except json.JSONDecodeError:
+            # Salvage trailing commas and similar slips; re-raise if still broken
+            parsed = json.loads(repair_json('{' + member + '}'))
+        self.members.update(parsed)
+        return list(parsed.items())
+
+    def result(self) -> Dict:
+        """Return the complete object, raising if the stream ended before it closed"""
+        if not self.closed:
+            raise json.JSONDecodeError("Truncated JSON stream", self.buffer, len(self.buffer))
+        return self.members
+
+
+class StreamMonitor:
+    """Validate sections of a streamed recipe as they close and time the stream"""
+
+    def __init__(self, validator):
+        self.validator = validator
+        self.parser = IncrementalJSONParser()
+        self.started_at = time.monotonic()
+        self.first_section_at: Optional[float] = None
+        self.sections = 0
+
+    def feed(self, chunk: str):
+        """Consume a chunk; raises ValueError on a broken section"""
+        for name, value in self.parser.feed(chunk):
+            if self.first_section_at is None:
+                self.first_section_at = time.monotonic() - self.started_at
+            self.sections += 1
+            error = self.validator.structural_error(name, value)
+            if error:
+                raise ValueError(f"Broken section '{name}': {error}")
+
+    def finish(self) -> Dict:
+        return self.parser.result()
+
+    @property
+    def text(self) -> str:
+        return self.parser.buffer
+
+    def stats(self, aborted: bool) -> Dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            'time_to_first_section': self.first_section_at,
+            'time_to_abort': elapsed if aborted else None,
+            'duration': elapsed,
+            'sections': self.sections,
+            'aborted': aborted
+        }
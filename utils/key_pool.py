@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.retry import retry_after_hint
+
+# Sliding window for the per-key quotas
+WINDOW_SECONDS = 60.0
+
+
+class KeyLease:
+    """One request's claim on a key; `release` settles its real token cost"""
+
+    def __init__(self, key: str, index: int, event: List[float]):
+        self.key = key
+        self.index = index
+        self.event = event
+
+
+class _KeyState:
+    def __init__(self):
+        # [timestamp, tokens] per request inside the window
+        self.events: Deque[List[float]] = deque()
+        self.tokens = 0.0
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+
+    def prune(self, now: float):
+        while self.events and now - self.events[0][0] >= WINDOW_SECONDS:
+            self.tokens -= self.events.popleft()[1]
+
+
+class ApiKeyPool:
+    """Least-loaded rotation over several API keys, each with its own RPM/TPM quota.
+
+    Every request claims the key with the fewest requests in flight and the most
+    quota left in the last minute. A key that answers 429 is benched for the
+    server's retry-after hint (or a full window). When every key is at quota,
+    callers wait for the earliest one to free up. A limit of 0 disables it.
+    """
+
+    def __init__(self, keys: List[str], requests_per_minute: int, tokens_per_minute: int):
+        if not keys:
+            raise ValueError("ApiKeyPool needs at least one key")
+        self.keys = list(keys)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._states = [_KeyState() for _ in self.keys]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def try_acquire(self, estimated_tokens: int) -> Tuple[Optional[KeyLease], float]:
+        """Claim the least-loaded key with quota left, or return (None, seconds to wait)"""
+        now = time.monotonic()
+        with self._lock:
+            best, best_load, wait = None, None, WINDOW_SECONDS
+            for index, state in enumerate(self._states):
+                state.prune(now)
+                if state.cooldown_until > now:
+                    wait = min(wait, state.cooldown_until - now)
+                    continue
+                key_wait = self._quota_wait(state, estimated_tokens, now)
+                if key_wait > 0:
+                    wait = min(wait, key_wait)
+                    continue
+                load = (state.in_flight, self._load(state))
+                if best is None or load < best_load:
+                    best, best_load = index, load
+            if best is None:
+                return None, wait
+
+            state = self._states[best]
+            event = [now, float(estimated_tokens)]
+            state.events.append(event)
+            state.tokens += estimated_tokens
+            state.in_flight += 1
+            return KeyLease(self.keys[best], best, event), 0.0
+
+    def acquire(self, estimated_tokens: int) -> KeyLease:
+        """Blocking claim for the synchronous service"""
+        while True:
+            lease, wait = self.try_acquire(estimated_tokens)
+            if lease:
+                return lease
+            time.sleep(wait)
+
+    async def acquire_async(self, estimated_tokens: int) -> KeyLease:
+        while True:
+            lease, wait = self.try_acquire(estimated_tokens)
+            if lease:
+                return lease
+            await asyncio.sleep(wait)
+
+    def release(self, lease: KeyLease, actual_tokens: Optional[int] = None, error: Optional[Exception] = None):
+        """Finish a request: settle its token cost and bench the key if it was rate limited"""
+        state = self._states[lease.index]
+        with self._lock:
+            state.in_flight -= 1
+            if actual_tokens is not None and lease.event in state.events:
+                state.tokens += actual_tokens - lease.event[1]
+                lease.event[1] = float(actual_tokens)
+            if error is not None and getattr(error, 'code', None) == 429:
+                state.cooldown_until = time.monotonic() + (retry_after_hint(error) or WINDOW_SECONDS)
+
+    def stats(self) -> List[Dict]:
+        """Per-key usage in the current window; keys are identified by position only"""
+        now = time.monotonic()
+        with self._lock:
+            for state in self._states:
+                state.prune(now)
+            return [
+                {
+                    'key': index,
+                    'requests': len(state.events),
+                    'tokens': int(state.tokens),
+                    'in_flight': state.in_flight,
+                    'cooling_down': state.cooldown_until > now
+                }
+                for index, state in enumerate(self._states)
+            ]
+
+    def _quota_wait(self, state: _KeyState, estimated_tokens: int, now: float) -> float:
+        """Seconds until this key can take the request (0 if it can now)"""
+        wait = 0.0
+        if self.requests_per_minute and len(state.events) >= self.requests_per_minute:
+            wait = state.events[0][0] + WINDOW_SECONDS - now
+        if self.tokens_per_minute and state.events and state.tokens + estimated_tokens > self.tokens_per_minute:
+            # Tokens free up as the oldest requests leave the window
+            excess = state.tokens + estimated_tokens - self.tokens_per_minute
+            for timestamp, tokens in state.events:
+                excess -= tokens
+                if excess <= 0:
+                    wait = max(wait, timestamp + WINDOW_SECONDS - now)
+                    break
+        return max(0.0, wait)
+
+    def _load(self, state: _KeyState) -> float:
+        loads = [0.0]
+        if self.requests_per_minute:
+            loads.append(len(state.events) / self.requests_per_minute)
+        if self.tokens_per_minute:
+            loads.append(state.tokens / self.tokens_per_minute)
+        return max(loads)
@@ -0,0 +1,144 @@
+import os
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from config.settings import Config
+from utils.generation_log import GenerationLog
+from utils.manifest import MANIFEST_NAME, Manifest
+
+# Words that do not change which recipe a keyword asks for
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'for', 'of', 'to', 'with', 'in', 'on', 'my', 'your',
+    'how', 'make', 'making', 'recipe', 'recipes', 'easy', 'best', 'simple', 'quick',
+    'homemade', 'ever', 'perfect', 'delicious'
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Output filenames are "<safe_keyword>_<YYYYmmdd>_<HHMMSS>.html"
+_OUTPUT_NAME_RE = re.compile(r'^(.+)_\d{8}_\d{6}\.html$')
+
+
+def singularize(word: str) -> str:
+    """Cheap English singular stem; only used to compare keywords, so it need not be a real word.
+
+    'berries' -> 'berry', 'tomatoes' -> 'tomato', and both 'cookie' and 'cookies' -> 'cooky'.
+    """
+    if len(word) <= 3 or word.endswith(('ss', 'us', 'is')):
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith(('oes', 'ches', 'shes', 'xes', 'sses')):
+        word = word[:-2]
+    elif word.endswith('s'):
+        word = word[:-1]
+    if word.endswith('ie') and len(word) > 3:
+        word = word[:-2] + 'y'
+    return word
+
+
+def normalize_keyword(keyword: str) -> FrozenSet[str]:
+    """Order-free token set: lowercased, singular, stopwords removed"""
+    tokens = {singularize(token) for token in _TOKEN_RE.findall(keyword.lower())}
+    meaningful = tokens - STOPWORDS
+    # A keyword made only of stopwords keeps them rather than matching everything
+    return frozenset(meaningful or tokens)
+
+
+class KeywordDeduplicator:
+    """Detect near-duplicate keywords before any API call is made.
+
+    Keywords are reduced to token sets (see `normalize_keyword`) and compared by
+    Jaccard similarity. An inverted token index limits each comparison to the few
+    known keywords sharing a token, so checking a 10k-keyword batch against a large
+    corpus stays fast.
+    """
+
+    def __init__(self, threshold: float = None):
+        self.threshold = Config.KEYWORD_DUPLICATE_THRESHOLD if threshold is None else threshold
+        self._signatures: List[FrozenSet[str]] = []
+        self._keywords: List[str] = []
+        self._sources: List[str] = []
+        self._by_token: Dict[str, Set[int]] = defaultdict(set)
+
+    def add(self, keyword: str, source: str):
+        signature = normalize_keyword(keyword)
+        if not signature:
+            return
+        index = len(self._keywords)
+        self._signatures.append(signature)
+        self._keywords.append(keyword)
+        self._sources.append(source)
+        for token in signature:
+            self._by_token[token].add(index)
+
+    def match(self, keyword: str) -> Optional[Tuple[str, str, float]]:
+        """Most similar known keyword as (keyword, source, similarity), if above the threshold"""
+        signature = normalize_keyword(keyword)
+        candidates = set()
+        for token in signature:
+            candidates |= self._by_token.get(token, set())
+        best = None
+        for index in candidates:
+            other = self._signatures[index]
+            similarity = len(signature & other) / len(signature | other)
+            if similarity >= self.threshold and (best is None or similarity > best[2]):
+                best = (self._keywords[index], self._sources[index], similarity)
+        return best
+
+    def load_corpus(self, log_dir: str = None, output_dir: str = None):
+        """Index keywords already generated, from the generation log (all segments) and the output manifest"""
+        seen = set()
+        for record in GenerationLog.read(log_dir):
+            keyword = record.get('keyword')
+            if record.get('success') is False or not isinstance(keyword, str):
+                continue
+            if keyword and keyword.lower() not in seen:
+                seen.add(keyword.lower())
+                self.add(keyword, 'existing')
+
+        output_dir = output_dir or Config.OUTPUT_DIR
+        for entry in Manifest(os.path.join(output_dir, MANIFEST_NAME)).entries().values():
+            if entry['keyword'].lower() not in seen:
+                seen.add(entry['keyword'].lower())
+                self.add(entry['keyword'], 'existing')
+
+        # Pages published before the manifest existed sit directly in the output directory
+        if os.path.isdir(output_dir):
+            for name in os.listdir(output_dir):
+                match = _OUTPUT_NAME_RE.match(name)
+                if match:
+                    keyword = match.group(1).replace('_', ' ')
+                    if keyword not in seen:
+                        seen.add(keyword)
+                        self.add(keyword, 'existing')
+
+    def filter(self, keywords: Iterable[str]) -> Tuple[List[str], List[Dict]]:
+        """Split keywords into (unique, duplicates); earlier batch keywords win over later variants"""
+        unique, duplicates = [], []
+        for keyword in keywords:
+            found = self.match(keyword)
+            # A keyword generated before under the exact same name is left to the job store
+            if found and found[1] == 'existing' and found[0].lower() == keyword.lower():
+                found = None
+            if found:
+                duplicate_of, source, similarity = found
+                duplicates.append({
+                    'keyword': keyword,
+                    'duplicate_of': duplicate_of,
+                    'source': source,
+                    'similarity': round(similarity, 2)
+                })
+                continue
+            unique.append(keyword)
+            self.add(keyword, 'batch')
+        return unique, duplicates
+
+    @staticmethod
+    def print_report(duplicates: List[Dict], skipped: bool = True):
+        action = "Skipping" if skipped else "Found"
+        print(f"🔁 {action} {len(duplicates)} near-duplicate keywords")
+        for i, duplicate in enumerate(duplicates):
+            branch = "└──" if i == len(duplicates) - 1 else "├──"
+            print(f"   {branch} '{duplicate['keyword']}' ≈ '{duplicate['duplicate_of']}' "
+                  f"({duplicate['source']}, {duplicate['similarity']:.2f})")
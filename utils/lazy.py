@@ -0,0 +1,25 @@
+import threading
+
+
+class lazy_property:
+    """Build an attribute on first access and cache it on the instance.
+
+    Like functools.cached_property, but creation is serialised by a lock so
+    phases running concurrently on first use still share a single client. Once
+    cached, reads go straight to the instance dict, and assigning the attribute
+    replaces it (used by benchmarks to swap in fakes).
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        self._lock = threading.RLock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self._lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.func(instance)
+        return instance.__dict__[self.name]
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from utils.job_store import JobStore
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+
+class Manifest:
+    """Append-only index of published pages: keyword -> path, content hash, timestamp.
+
+    One JSON line is appended per publish, and the latest line per keyword wins.
+    Regenerating a keyword does not delete its earlier page, which stays on disk
+    and linked; `all_entries` still lists it so rerender keeps it current, and
+    lines re-appended for such a page are marked `superseded` so they never
+    replace the keyword's latest page.
+    Each line goes out in a single O_APPEND write, so batch threads, the HTTP
+    service and rerender runs can share the file. Readers keep an in-memory
+    index and only parse lines appended since their last read, so "is this
+    keyword published?" and deploy syncs never walk the output tree. Paths are
+    relative to the manifest's directory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.root = os.path.dirname(path) or '.'
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict] = {}
+        self._offset = 0
+
+    def append(self, keyword: str, html_path: str, sha256: str, size: int, compressed: List[str],
+               superseded: bool = False) -> Dict:
+        entry = {
+            'keyword': keyword,
+            'path': os.path.relpath(html_path, self.root).replace(os.sep, '/'),
+            'sha256': sha256,
+            'bytes': size,
+            'compressed': compressed,
+            'timestamp': datetime.now().isoformat(timespec='seconds')
+        }
+        if superseded:
+            entry['superseded'] = True
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        return entry
+
+    def entries(self) -> Dict[str, Dict]:
+        """Latest entry per normalised keyword"""
+        with self._lock:
+            self._refresh()
+            return dict(self._index)
+
+    def lookup(self, keyword: str) -> Optional[Dict]:
+        with self._lock:
+            self._refresh()
+            return self._index.get(JobStore.make_key(keyword))
+
+    def all_entries(self) -> Iterator[Dict]:
+        """Every line in file order, including pages superseded by a newer one for the same keyword"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def is_superseded(self, keyword: str, html_path: str) -> bool:
+        """Whether another page is the latest for this keyword"""
+        current = self.lookup(keyword)
+        return current is not None and os.path.normpath(self.full_path(current)) != os.path.normpath(html_path)
+
+    def changed_since(self, since: Optional[datetime] = None) -> List[Dict]:
+        """Latest entry per page published after `since` (all of them if None), oldest first"""
+        latest = {entry['path']: entry for entry in self.all_entries()}
+        entries = sorted(latest.values(), key=lambda entry: entry['timestamp'])
+        if since is None:
+            return entries
+        return [entry for entry in entries if datetime.fromisoformat(entry['timestamp']) > since]
+
+    def full_path(self, entry: Dict) -> str:
+        return os.path.join(self.root, *entry['path'].split('/'))
+
+    def compact(self) -> int:
+        """Rewrite the manifest with the latest line per page; returns lines dropped.
+
+        Superseded pages are kept while their file exists, so rerender still
+        finds them. Lines appended by another process while compacting are
+        lost, so run it while nothing is publishing.
+        """
+        from utils.file_manager import FileManager
+
+        with self._lock:
+            self._refresh()
+            latest_paths = {entry['path'] for entry in self._index.values()}
+            kept: Dict[str, Dict] = {}
+            lines = 0
+            for entry in self.all_entries():
+                lines += 1
+                # Re-inserting moves the page to its latest position, keeping later lines later
+                kept.pop(entry['path'], None)
+                kept[entry['path']] = entry
+            if not lines:
+                return 0
+            content = ''.join(
+                json.dumps(entry, ensure_ascii=False) + '\n' for path, entry in kept.items()
+                if path in latest_paths or os.path.exists(self.full_path(entry))
+            )
+            FileManager.write_atomic(self.path, content)
+            self._index, self._offset = {}, 0
+            self._refresh()
+            return lines - content.count('\n')
+
+    def _refresh(self):
+        """Parse lines appended since the last read (everything, if the file was compacted)"""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            self._index, self._offset = {}, 0
+            return
+        if size < self._offset:
+            self._index, self._offset = {}, 0
+        if size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # a line still being written; read it next time
+                self._offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not entry.get('superseded'):
+                    self._index[JobStore.make_key(entry['keyword'])] = entry
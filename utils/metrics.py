@@ -0,0 +1,249 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, TextIO
+
+from config.settings import Config
+
+
+class Span:
+    """A timed unit of work with free-form attributes and summed counters"""
+
+    def __init__(self, name: str, parent: Optional['Span'], attrs: Dict):
+        self.name = name
+        self.parent = parent
+        self.attrs = dict(attrs)
+        self.counters: Dict[str, float] = {}
+        self.status = 'ok'
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    @property
+    def path(self) -> str:
+        return f"{self.parent.path}/{self.name}" if self.parent else self.name
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            self.status = 'error'
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'path': self.path,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'duration_ms': round((self.duration or 0.0) * 1000, 2),
+            'status': self.status,
+            'error': self.error,
+            'attrs': self.attrs,
+            'counters': self.counters
+        }
+
+
+class Trace:
+    """All spans recorded while generating one recipe"""
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict:
+        """Per-phase durations plus Gemini call, attempt and token totals"""
+        with self._lock:
+            spans = list(self.spans)
+        phases: Dict[str, float] = {}
+        totals: Dict[str, float] = {}
+        for span in spans:
+            if span.name == 'gemini.call':
+                totals['calls'] = totals.get('calls', 0) + 1
+            elif span.parent is not None and span.parent is self.root:
+                phases[span.name] = round(phases.get(span.name, 0.0) + (span.duration or 0.0) * 1000, 2)
+            for key, value in span.counters.items():
+                totals[key] = totals.get(key, 0) + value
+            if 'attempts' in span.attrs:
+                totals['attempts'] = totals.get('attempts', 0) + span.attrs['attempts']
+        duration = None
+        if self.root is not None:
+            duration = self.root.duration
+            if duration is None:
+                duration = time.perf_counter() - self.root._start
+        return {
+            'duration_ms': round(duration * 1000, 2) if duration is not None else None,
+            'phases_ms': phases,
+            'gemini': totals
+        }
+
+
+class MetricsHook:
+    """Receives every finished span and trace; subclass to export elsewhere"""
+
+    def on_span(self, span: Dict):
+        pass
+
+    def on_trace(self, trace: Dict):
+        pass
+
+
+class TextExporter(MetricsHook):
+    """Human-readable one line per trace (and optionally per span)"""
+
+    def __init__(self, stream: TextIO = None, spans: bool = False):
+        self.stream = stream or sys.stdout
+        self.spans = spans
+        self._lock = threading.Lock()
+
+    def on_span(self, span: Dict):
+        if not self.spans:
+            return
+        counters = ' '.join(f"{k}={v}" for k, v in span['counters'].items())
+        with self._lock:
+            print(f"⏱️ {span['path']} {span['duration_ms']:.1f}ms {span['status']} {counters}".rstrip(),
+                  file=self.stream)
+
+    def on_trace(self, trace: Dict):
+        summary = trace['summary']
+        phases = ', '.join(f"{name} {ms:.0f}ms" for name, ms in summary['phases_ms'].items())
+        tokens = summary['gemini']
+        with self._lock:
+            print(f"⏱️ {trace['name']} '{trace['attrs'].get('keyword', '')}' {summary['duration_ms']:.0f}ms "
+                  f"| {phases} | calls={tokens.get('calls', 0)} attempts={tokens.get('attempts', 0)} "
+                  f"tokens={tokens.get('prompt_tokens', 0)}+{tokens.get('response_tokens', 0)}",
+                  file=self.stream)
+
+
+class JSONExporter(MetricsHook):
+    """Append spans and trace summaries to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _write(self, record: Dict):
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def on_span(self, span: Dict):
+        self._write({'type': 'span', **span})
+
+    def on_trace(self, trace: Dict):
+        self._write({'type': 'trace', **trace})
+
+
+class Metrics:
+    """Span tracing with pluggable hooks.
+
+    Spans nest through a context variable, so code deep in the services can add
+    counters (tokens, cache hits) or attributes (attempts) to whatever phase is
+    currently running without the phase being passed down explicitly.
+    """
+
+    def __init__(self):
+        self.hooks: List[MetricsHook] = []
+        self._current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+        self._current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+
+    def add_hook(self, hook: MetricsHook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: MetricsHook):
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    @contextmanager
+    def trace(self, name: str, **attrs):
+        """Root span for one unit of work; yields the Trace collecting its spans"""
+        trace = Trace(name, attrs)
+        token = self._current_trace.set(trace)
+        try:
+            with self.span(name, **attrs) as root:
+                trace.root = root
+                yield trace
+        finally:
+            self._current_trace.reset(token)
+            record = {'name': name, 'attrs': attrs, 'summary': trace.summary()}
+            for hook in self.hooks:
+                self._call_hook(hook.on_trace, record)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        span = Span(name, self._current_span.get(), attrs)
+        token = self._current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._current_span.reset(token)
+            span.finish(error)
+            trace = self._current_trace.get()
+            if trace is not None:
+                trace.add(span)
+            if self.hooks:
+                record = span.to_dict()
+                for hook in self.hooks:
+                    self._call_hook(hook.on_span, record)
+
+    def add(self, **counters):
+        """Add to counters on the current span"""
+        span = self._current_span.get()
+        if span is not None:
+            for key, value in counters.items():
+                span.counters[key] = span.counters.get(key, 0) + value
+
+    def set(self, **attrs):
+        """Set attributes on the current span"""
+        span = self._current_span.get()
+        if span is not None:
+            span.attrs.update(attrs)
+
+    def record_usage(self, response):
+        """Add prompt/response token counts from a Gemini response's usage metadata"""
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is None:
+            return
+        self.add(
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            response_tokens=getattr(usage, 'candidates_token_count', 0) or 0
+        )
+
+    @staticmethod
+    def _call_hook(callback, record: Dict):
+        try:
+            callback(record)
+        except Exception as e:
+            print(f"⚠️ Metrics hook failed: {e}")
+
+    def configure_exporters(self):
+        """Attach the exporters selected by Config.METRICS_EXPORTERS"""
+        for name in filter(None, (n.strip() for n in Config.METRICS_EXPORTERS.split(','))):
+            if name == 'text':
+                self.add_hook(TextExporter())
+            elif name == 'json':
+                self.add_hook(JSONExporter(Config.METRICS_PATH))
+            else:
+                print(f"⚠️ Unknown metrics exporter '{name}'")
+
+
+# Process-wide instance used by the services and the generator
+metrics = Metrics()
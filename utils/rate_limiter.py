@@ -0,0 +1,77 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class AsyncTokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`.
+
+    A rate of 0 disables the bucket. `debit` lets callers settle the real cost
+    after the fact; the balance may go negative, which delays later acquirers.
+    """
+
+    def __init__(self, rate_per_minute: int, capacity: int = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1):
+        """Wait until `amount` tokens are available and take them"""
+        if not self.enabled:
+            return
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters FIFO so a large request is not starved by small ones
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def debit(self, amount: float):
+        """Adjust the balance by the difference between estimated and actual cost"""
+        if not self.enabled:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class AsyncRateLimiter:
+    """Combined concurrency cap, requests-per-minute and tokens-per-minute limiter"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int):
+        self.requests = AsyncTokenBucket(requests_per_minute)
+        self.tokens = AsyncTokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        """Hold a concurrency slot with request and token budget reserved.
+
+        Yields a dict; set `actual_tokens` on it to reconcile the token bucket.
+        """
+        if self._semaphore:
+            await self._semaphore.acquire()
+        try:
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+            usage = {'actual_tokens': None}
+            yield usage
+            if usage['actual_tokens'] is not None:
+                self.tokens.debit(usage['actual_tokens'] - estimated_tokens)
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
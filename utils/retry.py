@@ -0,0 +1,102 @@
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+from config.settings import Config
+
+# HTTP statuses worth retrying and counting against the circuit breaker
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_RETRY_HINT_RE = re.compile(r'retry(?:[_ -](?:after|delay|in))?\D{0,20}?(\d+(?:\.\d+)?)\s*s', re.IGNORECASE)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint that has been failing repeatedly"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by every caller of one endpoint.
+
+    After `failure_threshold` consecutive transient failures the circuit opens and
+    calls fail fast for `cooldown` seconds. Afterwards a single trial call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def before_call(self):
+        """Raise CircuitOpenError if calls are currently blocked"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"{self.name} circuit open after {self._failures} consecutive failures"
+                    f" (retry in {max(remaining, 0):.0f}s)"
+                )
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, exc: Exception):
+        if not is_transient_error(exc):
+            # The endpoint answered; a bad request says nothing about its health
+            with self._lock:
+                self._trial_in_flight = False
+            return
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold > 0:
+                if self._opened_at is None:
+                    print(f"⛔ {self.name} circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """Rate limiting, server errors, timeouts and connection failures"""
+    code = getattr(exc, 'code', None)
+    if isinstance(code, int) and code in TRANSIENT_STATUS_CODES:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def retry_after_hint(exc: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, from a Retry-After header or the error text"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    if getattr(exc, 'code', None) in (429, 503):
+        match = _RETRY_HINT_RE.search(str(exc))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server retry-after hint sets the floor"""
+    delay = random.uniform(0, min(Config.RETRY_MAX_DELAY, Config.RETRY_BASE_DELAY * 2 ** (attempt + 1)))
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, Config.RETRY_BASE_DELAY)
+    return delay
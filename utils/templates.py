@@ -0,0 +1,26 @@
+import os
+from typing import TYPE_CHECKING
+
+from config.settings import Config
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+
+RECIPE_TEMPLATE = 'recipe_body.html'
+
+
+def load_recipe_template(template_dir: str = 'templates') -> 'Template':
+    """Load the recipe template through an on-disk bytecode cache.
+
+    The cache directory is shared by every process, so batch workers and rerender
+    pools load compiled bytecode instead of recompiling the template on start.
+    Jinja still checks the template's mtime, so edits invalidate the cache.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    bytecode_cache = None
+    if Config.TEMPLATE_CACHE_DIR:
+        os.makedirs(Config.TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(Config.TEMPLATE_CACHE_DIR)
+    env = Environment(loader=FileSystemLoader(template_dir), bytecode_cache=bytecode_cache)
+    return env.get_template(RECIPE_TEMPLATE)
@@ -1,7 +1,128 @@
-from typing import Dict
+import copy
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
 from config.settings import Config
 
 class ContentValidator:
+    # Required keys for the items of each list section
+    SECTION_ITEM_KEYS = {
+        'variations': ('title', 'description'),
+        'storage': ('title', 'content'),
+        'faqs': ('question', 'answer'),
+        'tips': ('title', 'content')
+    }
+
+    # Expected JSON types of the top-level recipe sections
+    SECTION_TYPES = {
+        'title': str,
+        'rating': (int, float),
+        'review_count': int,
+        'difficulty': str,
+        'prep_time': int,
+        'cook_time': int,
+        'total_time': int,
+        'servings': int,
+        'introduction': dict,
+        'ingredients': list,
+        'instructions': list,
+        'nutrition': dict,
+        'variations': list,
+        'storage': list,
+        'faqs': list,
+        'tips': list
+    }
+
+    # Content sections Gemini can be asked to regenerate on their own
+    REPAIRABLE_SECTIONS = (
+        'introduction', 'ingredients', 'instructions', 'nutrition',
+        'variations', 'storage', 'faqs', 'tips'
+    )
+
+    def expected_counts(self) -> Dict[str, Tuple[int, int]]:
+        """(min, max) item counts of the list sections"""
+        return {
+            'ingredients': (Config.MIN_INGREDIENTS, Config.MAX_INGREDIENTS),
+            'instructions': (Config.MIN_STEPS, Config.MAX_STEPS),
+            'variations': (Config.VARIATION_COUNT, Config.VARIATION_COUNT),
+            'storage': (Config.STORAGE_SECTIONS, Config.STORAGE_SECTIONS),
+            'faqs': (Config.FAQ_COUNT, Config.FAQ_COUNT),
+            'tips': (Config.TIPS_COUNT, Config.TIPS_COUNT)
+        }
+
+    def find_problems(self, recipe_data: Dict) -> List[Dict]:
+        """Structured findings for raw model output, before validate_and_fix pads it.
+
+        Each finding has `section`, `problem` (missing, wrong_type, incomplete,
+        too_few or too_many) and a human-readable `message`; count problems also
+        carry `expected` and `actual`.
+        """
+        findings = []
+        counts = self.expected_counts()
+
+        for name in self.SECTION_TYPES:
+            value = recipe_data.get(name)
+            if value is None or value == '' or value == [] or value == {}:
+                findings.append({'section': name, 'problem': 'missing', 'message': "missing or empty"})
+                continue
+            error = self.section_error(name, value)
+            if error:
+                findings.append({'section': name, 'problem': 'wrong_type', 'message': error})
+                continue
+
+            if name == 'introduction':
+                empty = [p for p in ('paragraph1', 'paragraph2')
+                         if not (isinstance(value.get(p), str) and value[p].strip())]
+                if empty:
+                    findings.append({'section': name, 'problem': 'incomplete', 'message': f"empty {', '.join(empty)}"})
+            elif name in self.SECTION_ITEM_KEYS:
+                keys = self.SECTION_ITEM_KEYS[name]
+                bad = sum(1 for item in value if not all(isinstance(item.get(k), str) and item[k].strip() for k in keys))
+                if bad:
+                    findings.append({'section': name, 'problem': 'incomplete',
+                                     'message': f"{bad} items without {' and '.join(keys)}"})
+            elif name in ('ingredients', 'instructions'):
+                blank = sum(1 for item in value if not item.strip())
+                if blank:
+                    findings.append({'section': name, 'problem': 'incomplete', 'message': f"{blank} blank items"})
+
+            if name in counts:
+                low, high = counts[name]
+                expected = f"{low}" if low == high else f"{low}-{high}"
+                if len(value) < low:
+                    findings.append({'section': name, 'problem': 'too_few', 'expected': low, 'actual': len(value),
+                                     'message': f"{len(value)} items, expected {expected}"})
+                elif len(value) > high:
+                    findings.append({'section': name, 'problem': 'too_many', 'expected': high, 'actual': len(value),
+                                     'message': f"{len(value)} items, expected {expected}"})
+
+        return findings
+
+    def sections_to_regenerate(self, findings: List[Dict]) -> List[str]:
+        """Content sections worth a targeted Gemini call; bad scalars are left to validate_and_fix"""
+        flagged = {f['section'] for f in findings if f['problem'] != 'too_many'}
+        return [name for name in self.REPAIRABLE_SECTIONS if name in flagged]
+
+    def section_error(self, name: str, value) -> Optional[str]:
+        """Describe a structurally broken section, or None if it can be used or fixed"""
+        expected = self.SECTION_TYPES.get(name)
+        if expected is None:
+            return None
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            return f"expected {getattr(expected, '__name__', 'number')}, got {type(value).__name__}"
+        if name in ('ingredients', 'instructions'):
+            if not all(isinstance(item, str) for item in value):
+                return "items must be strings"
+        if name in self.SECTION_ITEM_KEYS:
+            if not all(isinstance(item, dict) for item in value):
+                return "items must be objects"
+        return None
+
+    def structural_error(self, name: str, value) -> Optional[str]:
+        """section_error for list and object sections only; scalars are repaired by validate_and_fix"""
+        if self.SECTION_TYPES.get(name) not in (list, dict):
+            return None
+        return self.section_error(name, value)
+
     def validate_and_fix(self, recipe_data: Dict) -> Dict:
         """Auto-validate and fix recipe content with more robust checks."""
         
@@ -49,3 +170,59 @@ class ContentValidator:
             )
         
         return recipe_data
+
+    def count_keyword_appearances(self, recipe_data: Dict, keyword: str) -> int:
+        """Count case-insensitive whole-phrase occurrences of the keyword across all text"""
+        pattern = re.compile(r'\b' + r'\s+'.join(map(re.escape, keyword.split())) + r'\b', re.IGNORECASE)
+        return sum(len(pattern.findall(text)) for text in self._iter_text(recipe_data))
+
+    def _iter_text(self, value) -> Iterator[str]:
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from self._iter_text(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from self._iter_text(item)
+
+    def apply_patch(self, recipe_data: Dict, patch: Dict) -> Dict:
+        """Return a copy of recipe_data with the well-formed sections of patch merged in.
+
+        List sections and nutrition are replaced wholesale, introduction paragraphs and the title
+        individually. Malformed or empty sections are ignored so the validated base
+        content is never degraded.
+        """
+        merged = copy.deepcopy(recipe_data)
+        if not isinstance(patch, dict):
+            return merged
+
+        title = patch.get('title')
+        if isinstance(title, str) and title.strip():
+            merged['title'] = title.strip()
+
+        introduction = patch.get('introduction')
+        if isinstance(introduction, dict):
+            for paragraph in ('paragraph1', 'paragraph2'):
+                text = introduction.get(paragraph)
+                if isinstance(text, str) and text.strip():
+                    merged.setdefault('introduction', {})[paragraph] = text.strip()
+
+        for section, required_keys in self.SECTION_ITEM_KEYS.items():
+            items = patch.get(section)
+            if not isinstance(items, list) or not items:
+                continue
+            if all(isinstance(item, dict) and all(isinstance(item.get(k), str) and item[k].strip() for k in required_keys)
+                   for item in items):
+                merged[section] = items
+
+        for section in ('ingredients', 'instructions'):
+            items = patch.get(section)
+            if isinstance(items, list) and items and all(isinstance(item, str) and item.strip() for item in items):
+                merged[section] = items
+
+        nutrition = patch.get('nutrition')
+        if isinstance(nutrition, dict) and nutrition:
+            merged['nutrition'] = nutrition
+
+        return merged